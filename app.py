@@ -13,7 +13,7 @@ import os
 from contextlib import contextmanager
 from dataclasses import asdict
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 import gradio as gr
 from dotenv import load_dotenv
@@ -40,8 +40,19 @@ from src.activation.personalization.config_loader import load_personalization_co
 
 load_dotenv()
 
+
+class _NoopEngine:
+    """Stand-in for an engine that failed to initialize; every call raises."""
+
+    def __init__(self, message: str) -> None:
+        self.message = message
+
+    def recognize_intent(self, **kwargs: Any) -> Dict[str, Any]:
+        raise RuntimeError(self.message)
+
+
 ENGINE_ERROR: Optional[str] = None
-ENGINE: Optional[IntentRecognitionEngine] = None
+ENGINE: Union[IntentRecognitionEngine, _NoopEngine]
 TAXONOMY: Optional[IntentTaxonomy] = None
 BID_OPTIMIZER: Optional[IntentAwareBidOptimizer] = None
 BID_OPTIMIZER_ERROR: Optional[str] = None
@@ -57,6 +68,7 @@ except Exception as exc:  # noqa: BLE001 - surface config errors to UI
         "Unable to initialize the Intent Recognition Engine.\n\n" \
         f"Details: {exc}\n\nSet ANTHROPIC_API_KEY, OPENAI_API_KEY, or OPENROUTER_API_KEY in your environment."
     )
+    ENGINE = _NoopEngine(ENGINE_ERROR)
 
 if TAXONOMY is not None:
     try:
@@ -143,8 +155,13 @@ def _normalize_settings(llm_settings: Optional[Dict[str, Any]]) -> Dict[str, Any
     }
 
 
-def _resolve_engine(llm_settings: Optional[Dict[str, Any]]) -> Tuple[Optional[IntentRecognitionEngine], Optional[str]]:
-    """Use override settings if provided, otherwise return default engine."""
+def _resolve_engine(llm_settings: Optional[Dict[str, Any]]) -> Union[IntentRecognitionEngine, _NoopEngine]:
+    """
+    Use override settings if provided, otherwise return default engine.
+
+    Configuration failures come back as a `_NoopEngine`, so callers only need
+    their usual exception handling around `recognize_intent`.
+    """
     settings = _normalize_settings(llm_settings)
     if settings["enabled"]:
         provider = settings["provider"] if settings["provider"] in LLM_PROVIDER_CHOICES else "openrouter"
@@ -155,12 +172,11 @@ def _resolve_engine(llm_settings: Optional[Dict[str, Any]]) -> Tuple[Optional[In
             provider_kwargs["model"] = settings["model"]
         try:
             llm = LLMProviderFactory.create(provider_name=provider, **provider_kwargs)
-            engine = IntentRecognitionEngine(llm_provider=llm, taxonomy=TAXONOMY)
-            return engine, None
+            return IntentRecognitionEngine(llm_provider=llm, taxonomy=TAXONOMY)
         except Exception as exc:
-            return None, f"LLM override error: {exc}"
+            return _NoopEngine(f"LLM override error: {exc}")
 
-    return ENGINE, ENGINE_ERROR
+    return ENGINE
 
 
 @contextmanager
@@ -325,9 +341,7 @@ def _prepare_activation_context(
             "source": "manual_override",
         }
     else:
-        engine, engine_error = _resolve_engine(llm_settings)
-        if engine is None:
-            return None, None, None, None, engine_error or "Intent engine not configured."
+        engine = _resolve_engine(llm_settings)
         try:
             intent_payload = engine.recognize_intent(
                 user_query=user_query,
@@ -457,6 +471,14 @@ def load_sample_values(sample_name: str) -> Tuple[str, str, str, int, str]:
     )
 
 
+# Form values for every sample, serialized for the client-side dropdown handler.
+SAMPLE_FIELD_VALUES = {name: load_sample_values(name) for name in SAMPLE_LOOKUP}
+SAMPLE_FIELDS_JS = (
+    f"(name) => ({json.dumps(SAMPLE_FIELD_VALUES)})[name] "
+    f"|| {json.dumps(load_sample_values(''))}"
+)
+
+
 def analyze_intent(
     user_query: str,
     page_type: str,
@@ -471,10 +493,7 @@ def analyze_intent(
 ) -> Tuple[str, str, Dict[str, Any], str]:
     """Run the intent recognition engine and return JSON + markdown summary + context."""
 
-    engine, engine_error = _resolve_engine(llm_settings)
-    if engine is None:
-        error_json = json.dumps({"error": True, "message": engine_error or "LLM not configured"}, indent=2)
-        return error_json, engine_error or "", {}, ""
+    engine = _resolve_engine(llm_settings)
 
     # Build context preview (Layer 1)
     context_view = CONTEXT_BUILDER.build_context(
@@ -515,11 +534,13 @@ def analyze_intent(
 
     recs = result.get("recommended_marketing_actions", [])
     if recs:
-        summary.append("\n**Recommended Actions:**" + "\n" + "\n".join(f"- {item}" for item in recs[:4]))
+        summary.append("\n**Recommended Actions:**")
+        summary.extend(f"- {item}" for item in recs[:4])
 
     nxt = result.get("predicted_next_actions", [])
     if nxt:
-        summary.append("\n**Predicted Next Actions:**" + "\n" + "\n".join(f"- {item}" for item in nxt[:3]))
+        summary.append("\n**Predicted Next Actions:**")
+        summary.extend(f"- {item}" for item in nxt[:3])
 
     return json.dumps(result, indent=2), "\n".join(summary), context_view, context_summary
 
@@ -907,7 +928,7 @@ with gr.Blocks(title="Context-Conditioned Intent Recognition", analytics_enabled
         """
     )
 
-    if ENGINE is None:
+    if ENGINE_ERROR is not None:
         gr.Markdown(
             "ℹ️ **Bring your own API key:** Expand the LLM Settings panel below or set `ANTHROPIC_API_KEY`, `OPENAI_API_KEY`, or `OPENROUTER_API_KEY` in the Space secrets.",
             elem_id="no-server-keys",
@@ -939,7 +960,7 @@ with gr.Blocks(title="Context-Conditioned Intent Recognition", analytics_enabled
             clear_llm_btn = gr.Button("Clear", variant="secondary")
         default_status = (
             "Using server/.env credentials."
-            if ENGINE is not None
+            if ENGINE_ERROR is None
             else "No server credentials detected. Enable custom mode and paste your API key below."
         )
         llm_status = gr.Markdown(default_status)
@@ -1018,11 +1039,10 @@ with gr.Blocks(title="Context-Conditioned Intent Recognition", analytics_enabled
                     value="Run an analysis to preview the structured context feeding the LLM.",
                 )
 
-            def _populate_sample(sample_name: str):  # noqa: ANN001
-                return load_sample_values(sample_name)
-
+            # Sample lookup runs in the browser, so picking a scenario never hits the server queue.
             sample_dropdown.change(
-                _populate_sample,
+                fn=None,
+                js=SAMPLE_FIELDS_JS,
                 inputs=[sample_dropdown],
                 outputs=[user_query, page_type, previous_actions, time_on_page, session_history],
             )
@@ -1185,7 +1205,7 @@ with gr.Blocks(title="Context-Conditioned Intent Recognition", analytics_enabled
             )
             act_use_manual_intent = gr.Checkbox(
                 label="Manual Intent Override",
-                value=ENGINE is None,
+                value=ENGINE_ERROR is not None,
                 info="Enable to skip the LLM and enter intent+confidence manually.",
             )
             act_manual_intent_label = gr.Dropdown(
@@ -1360,7 +1380,7 @@ with gr.Blocks(title="Context-Conditioned Intent Recognition", analytics_enabled
             )
             use_manual_intent = gr.Checkbox(
                 label="Manual Intent Override",
-                value=ENGINE is None,
+                value=ENGINE_ERROR is not None,
                 info="Enable if you want to skip the LLM and enter intent + confidence yourself.",
             )
             manual_intent_label = gr.Dropdown(
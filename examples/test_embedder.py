@@ -10,12 +10,22 @@ Usage:
 
 import sys
 import os
+
 import numpy as np
 
 # Add parent directory to path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from src.patterns.embedder import BehavioralEmbedder
+from src.patterns.embedder import SESSION_DTYPE, BehavioralEmbedder
+
+
+def pairwise_cosine(matrix: np.ndarray) -> np.ndarray:
+    """Cosine similarity between every pair of rows from a single Gram-matrix GEMM."""
+    matrix = np.asarray(matrix, dtype=np.float32)
+    gram = matrix @ matrix.T
+    # Squared row norms are the Gram diagonal; no separate abs/power pass needed
+    norms = np.sqrt(np.diagonal(gram))
+    return gram / np.outer(norms, norms)
 
 
 def main():
@@ -31,160 +41,54 @@ def main():
     print(f"✅ Embedder ready: {embedder}")
     print(f"   Embedding dimension: {embedder.get_embedding_dimension()}\n")
 
-    # Create sample user histories
+    # Create sample user histories, one structured row per session:
+    # (intent, confidence, timestamp, channel, engagement_level,
+    #  has_budget_constraint, has_time_constraint, has_knowledge_gap,
+    #  urgency_level, expertise_level)
     print("📝 Creating sample user histories...\n")
 
     # User 1: Research-heavy comparer (from article)
-    user1_history = [
-        {
-            "intent": "category_research",
-            "confidence": 0.85,
-            "timestamp": "2025-01-10T10:00:00",
-            "channel": "organic",
-            "engagement_level": "high",
-            "has_budget_constraint": False,
-            "has_time_constraint": False,
-            "has_knowledge_gap": True,
-            "urgency_level": "low",
-            "expertise_level": "novice"
-        },
-        {
-            "intent": "compare_options",
-            "confidence": 0.90,
-            "timestamp": "2025-01-12T14:00:00",
-            "channel": "organic",
-            "engagement_level": "very_high",
-            "has_budget_constraint": False,
-            "has_time_constraint": False,
-            "has_knowledge_gap": False,
-            "urgency_level": "low",
-            "expertise_level": "intermediate"
-        },
-        {
-            "intent": "evaluate_fit",
-            "confidence": 0.88,
-            "timestamp": "2025-01-14T16:00:00",
-            "channel": "email",
-            "engagement_level": "high",
-            "has_budget_constraint": False,
-            "has_time_constraint": True,
-            "has_knowledge_gap": False,
-            "urgency_level": "medium",
-            "expertise_level": "intermediate"
-        },
-        {
-            "intent": "ready_to_purchase",
-            "confidence": 0.92,
-            "timestamp": "2025-01-15T18:00:00",
-            "channel": "direct",
-            "engagement_level": "very_high",
-            "has_budget_constraint": False,
-            "has_time_constraint": True,
-            "has_knowledge_gap": False,
-            "urgency_level": "high",
-            "expertise_level": "intermediate"
-        }
-    ]
+    user1_history = np.array([
+        ('category_research', 0.85, '2025-01-10T10:00:00', 'organic', 'high', False, False, True, 'low', 'novice'),
+        ('compare_options', 0.90, '2025-01-12T14:00:00', 'organic', 'very_high', False, False, False, 'low', 'intermediate'),
+        ('evaluate_fit', 0.88, '2025-01-14T16:00:00', 'email', 'high', False, True, False, 'medium', 'intermediate'),
+        ('ready_to_purchase', 0.92, '2025-01-15T18:00:00', 'direct', 'very_high', False, True, False, 'high', 'intermediate'),
+    ], dtype=SESSION_DTYPE)
 
     # User 2: Fast impulse buyer
-    user2_history = [
-        {
-            "intent": "browsing_inspiration",
-            "confidence": 0.75,
-            "timestamp": "2025-01-15T12:00:00",
-            "channel": "social",
-            "engagement_level": "medium",
-            "has_budget_constraint": False,
-            "has_time_constraint": False,
-            "has_knowledge_gap": False,
-            "urgency_level": "low",
-            "expertise_level": "intermediate"
-        },
-        {
-            "intent": "ready_to_purchase",
-            "confidence": 0.82,
-            "timestamp": "2025-01-15T12:15:00",
-            "channel": "social",
-            "engagement_level": "medium",
-            "has_budget_constraint": False,
-            "has_time_constraint": False,
-            "has_knowledge_gap": False,
-            "urgency_level": "low",
-            "expertise_level": "intermediate"
-        }
-    ]
+    user2_history = np.array([
+        ('browsing_inspiration', 0.75, '2025-01-15T12:00:00', 'social', 'medium', False, False, False, 'low', 'intermediate'),
+        ('ready_to_purchase', 0.82, '2025-01-15T12:15:00', 'social', 'medium', False, False, False, 'low', 'intermediate'),
+    ], dtype=SESSION_DTYPE)
 
     # User 3: Budget-conscious deal seeker
-    user3_history = [
-        {
-            "intent": "category_research",
-            "confidence": 0.78,
-            "timestamp": "2025-01-05T10:00:00",
-            "channel": "organic",
-            "engagement_level": "medium",
-            "has_budget_constraint": True,
-            "has_time_constraint": False,
-            "has_knowledge_gap": True,
-            "urgency_level": "low",
-            "expertise_level": "novice"
-        },
-        {
-            "intent": "price_discovery",
-            "confidence": 0.85,
-            "timestamp": "2025-01-07T15:00:00",
-            "channel": "organic",
-            "engagement_level": "medium",
-            "has_budget_constraint": True,
-            "has_time_constraint": False,
-            "has_knowledge_gap": False,
-            "urgency_level": "low",
-            "expertise_level": "novice"
-        },
-        {
-            "intent": "deal_seeking",
-            "confidence": 0.90,
-            "timestamp": "2025-01-10T11:00:00",
-            "channel": "email",
-            "engagement_level": "low",
-            "has_budget_constraint": True,
-            "has_time_constraint": False,
-            "has_knowledge_gap": False,
-            "urgency_level": "low",
-            "expertise_level": "novice"
-        },
-        {
-            "intent": "deal_seeking",
-            "confidence": 0.88,
-            "timestamp": "2025-01-15T09:00:00",
-            "channel": "email",
-            "engagement_level": "low",
-            "has_budget_constraint": True,
-            "has_time_constraint": False,
-            "has_knowledge_gap": False,
-            "urgency_level": "low",
-            "expertise_level": "novice"
-        }
-    ]
-
-    # Test individual embeddings
-    print("🔬 Test 1: Create embeddings for 3 different user types")
+    user3_history = np.array([
+        ('category_research', 0.78, '2025-01-05T10:00:00', 'organic', 'medium', True, False, True, 'low', 'novice'),
+        ('price_discovery', 0.85, '2025-01-07T15:00:00', 'organic', 'medium', True, False, False, 'low', 'novice'),
+        ('deal_seeking', 0.90, '2025-01-10T11:00:00', 'email', 'low', True, False, False, 'low', 'novice'),
+        ('deal_seeking', 0.88, '2025-01-15T09:00:00', 'email', 'low', True, False, False, 'low', 'novice'),
+    ], dtype=SESSION_DTYPE)
+
+    # Embed all users in one batched pass, then inspect them individually
+    all_histories = [user1_history, user2_history, user3_history]
+    batch_embeddings = embedder.create_batch_embeddings(all_histories)
+    embedding1, embedding2, embedding3 = batch_embeddings
+
+    print("\n🔬 Test 1: Create embeddings for 3 different user types")
     print("-" * 70)
 
     print("\n👤 User 1: Research-Heavy Comparer")
-    print(f"   Journey: {' → '.join([r['intent'] for r in user1_history])}")
-    embedding1 = embedder.create_embedding(user1_history)
+    print(f"   Journey: {' → '.join(user1_history['intent'])}")
     print(f"   Embedding shape: {embedding1.shape}")
     print(f"   Embedding stats: mean={embedding1.mean():.4f}, std={embedding1.std():.4f}")
 
     print("\n👤 User 2: Fast Impulse Buyer")
-    print(f"   Journey: {' → '.join([r['intent'] for r in user2_history])}")
-    embedding2 = embedder.create_embedding(user2_history)
+    print(f"   Journey: {' → '.join(user2_history['intent'])}")
     print(f"   Embedding shape: {embedding2.shape}")
     print(f"   Embedding stats: mean={embedding2.mean():.4f}, std={embedding2.std():.4f}")
 
     print("\n👤 User 3: Budget-Conscious Deal Seeker")
-    print(f"   Journey: {' → '.join([r['intent'] for r in user3_history])}")
-    embedding3 = embedder.create_embedding(user3_history)
+    print(f"   Journey: {' → '.join(user3_history['intent'])}")
     print(f"   Embedding shape: {embedding3.shape}")
     print(f"   Embedding stats: mean={embedding3.mean():.4f}, std={embedding3.std():.4f}")
 
@@ -192,13 +96,12 @@ def main():
     print("\n\n🔬 Test 2: Calculate behavioral similarity")
     print("-" * 70)
 
-    # Cosine similarity
-    def cosine_similarity(a, b):
-        return np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b))
+    # All-pairs cosine similarity straight off the (n_users, dim) batch matrix
+    similarity = pairwise_cosine(batch_embeddings)
 
-    sim_1_2 = cosine_similarity(embedding1, embedding2)
-    sim_1_3 = cosine_similarity(embedding1, embedding3)
-    sim_2_3 = cosine_similarity(embedding2, embedding3)
+    sim_1_2 = similarity[0, 1]
+    sim_1_3 = similarity[0, 2]
+    sim_2_3 = similarity[1, 2]
 
     print(f"\n📊 Similarity Matrix:")
     print(f"   User 1 ↔ User 2 (Comparer vs Impulse):    {sim_1_2:.4f}")
@@ -218,9 +121,6 @@ def main():
     print("\n\n🔬 Test 3: Batch processing")
     print("-" * 70)
 
-    all_histories = [user1_history, user2_history, user3_history]
-    batch_embeddings = embedder.create_batch_embeddings(all_histories)
-
     print(f"\n📦 Batch embeddings shape: {batch_embeddings.shape}")
     print(f"   (3 users × {embedder.get_embedding_dimension()} dimensions)")
 
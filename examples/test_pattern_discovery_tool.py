@@ -10,10 +10,60 @@ Usage:
 
 import sys
 import os
+from collections import Counter
+from operator import itemgetter
 
 # Add parent directory to path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+# CSVs above this size are parsed with pandas' C reader instead of one big string.
+LARGE_CSV_BYTES = 1_000_000
+
+# Column name in the CSV -> (session key, default value), mirroring parse_user_histories_from_csv.
+SESSION_COLUMNS = {
+    'session_intent': ('intent', ''),
+    'confidence': ('confidence', '0.5'),
+    'timestamp': ('timestamp', ''),
+    'channel': ('channel', 'organic'),
+    'engagement_level': ('engagement_level', 'medium'),
+    'has_budget_constraint': ('has_budget_constraint', 'false'),
+    'has_time_constraint': ('has_time_constraint', 'false'),
+    'has_knowledge_gap': ('has_knowledge_gap', 'false'),
+    'urgency_level': ('urgency_level', 'medium'),
+    'expertise_level': ('expertise_level', 'intermediate'),
+}
+BOOL_COLUMNS = ('has_budget_constraint', 'has_time_constraint', 'has_knowledge_gap')
+
+
+def load_user_histories(csv_path):
+    """Parse a sessions CSV, streaming large files through pandas."""
+    if os.path.getsize(csv_path) <= LARGE_CSV_BYTES:
+        from tools.pattern_discovery_mcp import parse_user_histories_from_csv
+
+        with open(csv_path, 'r') as f:
+            return parse_user_histories_from_csv(f.read())
+
+    import pandas as pd
+
+    df = pd.read_csv(csv_path, dtype=str, keep_default_na=False, engine='c')
+    for column, (_, default) in SESSION_COLUMNS.items():
+        if column not in df.columns:
+            df[column] = default
+        df[column] = df[column].str.strip()
+    df['user_id'] = df['user_id'].str.strip()
+    df = df[df['user_id'] != '']
+
+    for column in BOOL_COLUMNS:
+        df[column] = df[column].str.lower().isin(('true', '1', 'yes'))
+    df['confidence'] = df['confidence'].astype(float)
+    df = df.rename(columns={column: key for column, (key, _) in SESSION_COLUMNS.items()})
+
+    session_keys = [key for key, _ in SESSION_COLUMNS.values()]
+    grouped = df.groupby('user_id', sort=True)[session_keys]
+    user_ids = list(grouped.groups.keys())
+    user_histories = [group.to_dict('records') for _, group in grouped]
+    return user_histories, user_ids
+
 
 def test_csv_parsing():
     """Test CSV parsing logic from the pattern discovery tool."""
@@ -22,9 +72,6 @@ def test_csv_parsing():
     print("🧪 Testing Pattern Discovery Tool - CSV Parsing")
     print("="*70 + "\n")
 
-    # Import the parsing function
-    from tools.pattern_discovery_mcp import parse_user_histories_from_csv
-
     # Read the sample CSV
     sample_csv_path = os.path.join(
         os.path.dirname(__file__),
@@ -39,12 +86,9 @@ def test_csv_parsing():
 
     print(f"📁 Reading sample CSV: {sample_csv_path}")
 
-    with open(sample_csv_path, 'r') as f:
-        csv_content = f.read()
-
     # Parse the CSV
     print("\n🔍 Parsing user histories from CSV...")
-    user_histories, user_ids = parse_user_histories_from_csv(csv_content)
+    user_histories, user_ids = load_user_histories(sample_csv_path)
 
     # Validate results
     print(f"\n✅ Parsing complete!")
@@ -57,11 +101,12 @@ def test_csv_parsing():
     print("📊 Sample User Histories:")
     print("-"*70)
 
+    get_intent = itemgetter('intent')
     for i, (user_id, history) in enumerate(zip(user_ids[:3], user_histories[:3])):
         print(f"\n👤 {user_id}:")
         print(f"   Sessions: {len(history)}")
 
-        intent_sequence = " → ".join([s['intent'] for s in history])
+        intent_sequence = " → ".join(map(get_intent, history))
         print(f"   Journey: {intent_sequence}")
 
         # Show first session details
@@ -81,27 +126,19 @@ def test_csv_parsing():
     print("-"*70)
 
     # Count sessions per user
-    session_counts = {}
-    for user_id, history in zip(user_ids, user_histories):
-        count = len(history)
-        session_counts[count] = session_counts.get(count, 0) + 1
+    session_counts = Counter(map(len, user_histories))
 
     print("\n   Sessions per user distribution:")
-    for count in sorted(session_counts.keys()):
-        users = session_counts[count]
+    for count, users in sorted(session_counts.items()):
         print(f"      {count} sessions: {users} users")
 
     # Count intents
-    intent_counts = {}
-    for history in user_histories:
-        for session in history:
-            intent = session['intent']
-            intent_counts[intent] = intent_counts.get(intent, 0) + 1
+    intent_counts = Counter(session['intent'] for history in user_histories for session in history)
+    total_intents = intent_counts.total()
 
     print("\n   Intent distribution:")
-    for intent in sorted(intent_counts.keys(), key=lambda x: intent_counts[x], reverse=True):
-        count = intent_counts[intent]
-        percentage = count / sum(intent_counts.values()) * 100
+    for intent, count in intent_counts.most_common():
+        percentage = count / total_intents * 100
         print(f"      {intent}: {count} ({percentage:.1f}%)")
 
     # Identify potential patterns
@@ -149,8 +186,6 @@ def validate_data_quality():
     print("🔬 Data Quality Validation")
     print("="*70 + "\n")
 
-    from tools.pattern_discovery_mcp import parse_user_histories_from_csv
-
     sample_csv_path = os.path.join(
         os.path.dirname(__file__),
         '..',
@@ -158,25 +193,22 @@ def validate_data_quality():
         'sample_user_histories.csv'
     )
 
-    with open(sample_csv_path, 'r') as f:
-        csv_content = f.read()
-
-    user_histories, user_ids = parse_user_histories_from_csv(csv_content)
+    user_histories, user_ids = load_user_histories(sample_csv_path)
 
     # Check for required fields
     print("✓ Required fields check:")
-    required_fields = [
+    required_fields = frozenset([
         'intent', 'confidence', 'timestamp', 'channel', 'engagement_level',
         'has_budget_constraint', 'has_time_constraint', 'has_knowledge_gap',
         'urgency_level', 'expertise_level'
-    ]
+    ])
 
     all_valid = True
     for i, history in enumerate(user_histories[:5]):
         for session in history:
-            missing = [f for f in required_fields if f not in session]
+            missing = required_fields.difference(session)
             if missing:
-                print(f"   ❌ User {user_ids[i]}: Missing fields {missing}")
+                print(f"   ❌ User {user_ids[i]}: Missing fields {sorted(missing)}")
                 all_valid = False
 
     if all_valid:
@@ -192,8 +224,8 @@ def validate_data_quality():
     }
 
     type_valid = True
-    for field, expected_type in type_checks.items():
-        sample_value = user_histories[0][0][field]
+    sample_values = itemgetter(*type_checks)(user_histories[0][0])
+    for (field, expected_type), sample_value in zip(type_checks.items(), sample_values):
         if not isinstance(sample_value, expected_type):
             print(f"   ❌ {field}: Expected {expected_type}, got {type(sample_value)}")
             type_valid = False
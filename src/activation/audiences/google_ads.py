@@ -11,12 +11,15 @@ from __future__ import annotations
 
 import hashlib
 import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import repeat
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional
-
-import yaml
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 from ..base import ActivationContext, ActivationError, AudienceCohort, AudienceConnector
+from ..config_loader import load_yaml_config
 
 try:  # pragma: no cover - optional dependency
     from google.ads.googleads.client import GoogleAdsClient  # type: ignore
@@ -24,6 +27,44 @@ except ImportError:  # pragma: no cover - optional dependency
     GoogleAdsClient = None  # type: ignore
 
 
+# Cohorts at least this large are hashed across worker processes.
+PARALLEL_HASH_THRESHOLD = 100_000
+HASH_CHUNK_SIZE = 50_000
+# Default byte budget for recently synced cohorts' hashed identifiers kept per
+# connector (~1M identifiers); cohorts larger than the budget are not cached.
+HASH_CACHE_BYTES = 32 * 1024 * 1024
+# Hashed identifiers are kept as packed raw SHA-256 digests and hex-encoded
+# only when building upload operations.
+DIGEST_SIZE = hashlib.sha256().digest_size
+# gRPC status codes worth retrying: the server was unavailable, timed out or throttled.
+TRANSIENT_STATUS_CODES = frozenset({"UNAVAILABLE", "DEADLINE_EXCEEDED", "RESOURCE_EXHAUSTED"})
+
+
+def _normalize_identifiers(identifiers: Iterable[str]) -> List[str]:
+    """Normalize identifiers and drop duplicates, keeping first-seen order."""
+    return list(dict.fromkeys(value.strip().lower() for value in identifiers if value))
+
+
+def _is_transient(exc: BaseException) -> bool:
+    """Whether a failed Google Ads call carries a retryable gRPC status."""
+    # GoogleAdsException wraps the gRPC call in ``error``; a bare grpc.RpcError exposes code() itself.
+    code = getattr(getattr(exc, "error", exc), "code", None)
+    if not callable(code):
+        return False
+    return getattr(code(), "name", None) in TRANSIENT_STATUS_CODES
+
+
+def _hash_chunk(values: List[str], salt_bytes: bytes) -> bytes:
+    """Salt-hash a chunk of normalized identifiers (module-level so workers can unpickle it)."""
+    digests = bytearray()
+    salted = hashlib.sha256(salt_bytes)
+    for value in values:
+        hasher = salted.copy()
+        hasher.update(value.encode("utf-8"))
+        digests += hasher.digest()
+    return bytes(digests)
+
+
 class GoogleAdsAudienceConnector(AudienceConnector):
     """
     Google Ads Customer Match exporter.
@@ -44,8 +85,14 @@ class GoogleAdsAudienceConnector(AudienceConnector):
         super().__init__()
         self.config = self._load_config(config_path)
         self.batch_size = int(self.config.get("batch_size", 1000))
+        self.upload_concurrency = max(1, int(self.config.get("upload_concurrency", 8)))
+        self.upload_retries = max(0, int(self.config.get("upload_retries", 3)))
         self.dry_run = dry_run if dry_run is not None else bool(self.config.get("dry_run", True))
         self.hashing_salt = self.config.get("hashing_salt", "")
+        self._salt_bytes = self.hashing_salt.encode("utf-8")
+        self.hash_cache_bytes = max(0, int(self.config.get("hash_cache_bytes", HASH_CACHE_BYTES)))
+        self._hash_cache: "OrderedDict[Tuple[bytes, bytes], bytes]" = OrderedDict()
+        self._hash_cache_used = 0
         self.credentials = {
             "developer_token": os.getenv("GOOGLE_ADS_DEVELOPER_TOKEN") or self.config.get("developer_token"),
             "login_customer_id": os.getenv("GOOGLE_ADS_LOGIN_CUSTOMER_ID") or self.config.get("login_customer_id"),
@@ -76,36 +123,51 @@ class GoogleAdsAudienceConnector(AudienceConnector):
                     "oauth2_refresh_token": self.credentials["refresh_token"],
                 }
             )
+            # Resolve the upload service and proto classes once; get_type()
+            # does a reflective lookup and builds a message on every call.
+            self._job_service = self.client.get_service("OfflineUserDataJobService")
+            self._job_cls = type(self.client.get_type("OfflineUserDataJob"))
+            self._job_operation_cls = type(self.client.get_type("OfflineUserDataJobOperation"))
+            self._user_identifier_cls = type(self.client.get_type("UserIdentifier"))
+            self._run_job_request_cls = type(self.client.get_type("RunOfflineUserDataJobRequest"))
+            self._customer_match_job_type = (
+                self.client.enums.OfflineUserDataJobTypeEnum.CUSTOMER_MATCH_USER_LIST
+            )
 
     # ------------------------------------------------------------------
     # AudienceConnector interface
     # ------------------------------------------------------------------
     def sync(self, cohort: AudienceCohort, context: ActivationContext) -> Dict[str, Any]:
-        hashed_ids = self._hash_identifiers(cohort.user_ids)
-        batches = list(self._batch(hashed_ids, self.batch_size))
+        if self.dry_run:
+            return self._simulate_sync(cohort)
 
-        if not batches:
+        hashed_ids = self._cached_hash_identifiers(cohort)
+        user_count = len(hashed_ids) // DIGEST_SIZE
+        batch_count = -(-user_count // self.batch_size)
+
+        if batch_count == 0:
             raise ActivationError("Audience cohort contains no identifiers to sync.")
 
         metadata = {
             "audience_name": cohort.name,
-            "user_count": len(hashed_ids),
-            "batch_count": len(batches),
+            "user_count": user_count,
+            "duplicate_count": sum(1 for user_id in cohort.user_ids if user_id) - user_count,
+            "batch_count": batch_count,
             "dry_run": self.dry_run,
         }
 
-        if self.dry_run:
-            metadata["status"] = "simulated_upload"
-            metadata["sample_hash"] = hashed_ids[:3]
-            return metadata
-
         if self.client is None:
             raise ActivationError("Google Ads client not configured.")
 
         user_list_resource = self._create_or_get_user_list(cohort)
-        uploads = []
-        for batch in batches:
-            uploads.append(self._upload_batch(user_list_resource, batch))
+        # Each batch is several blocking gRPC round-trips; overlap them on threads.
+        with ThreadPoolExecutor(max_workers=self.upload_concurrency) as pool:
+            uploads = list(
+                pool.map(
+                    lambda batch: self._upload_with_retry(user_list_resource, batch),
+                    self._batch(hashed_ids, self.batch_size),
+                )
+            )
 
         metadata["status"] = "uploaded"
         metadata["user_list_resource"] = user_list_resource
@@ -116,26 +178,65 @@ class GoogleAdsAudienceConnector(AudienceConnector):
     # Helpers
     # ------------------------------------------------------------------
     def _load_config(self, path_str: str) -> Dict[str, Any]:
-        path = Path(path_str)
-        if not path.exists():
-            raise ActivationError(f"Audience config not found: {path_str}")
-        with path.open("r", encoding="utf-8") as f:
-            content = yaml.safe_load(f) or {}
-        return content.get("google_ads", {})
-
-    def _hash_identifiers(self, identifiers: Iterable[str]) -> List[str]:
-        hashed: List[str] = []
-        for value in identifiers:
-            if not value:
-                continue
-            normalized = value.strip().lower()
-            digest = hashlib.sha256((self.hashing_salt + normalized).encode("utf-8")).hexdigest()
-            hashed.append(digest)
+        try:
+            content = load_yaml_config(Path(path_str))
+        except FileNotFoundError as exc:
+            raise ActivationError(f"Audience config not found: {path_str}") from exc
+        return dict(content.get("google_ads", {}))
+
+    def _simulate_sync(self, cohort: AudienceCohort) -> Dict[str, Any]:
+        """Dry-run summary that hashes only the identifiers shown in the sample."""
+        identifiers = _normalize_identifiers(cohort.user_ids)
+        user_count = len(identifiers)
+        if user_count == 0:
+            raise ActivationError("Audience cohort contains no identifiers to sync.")
+
+        sample = _hash_chunk(identifiers[:3], self._salt_bytes)
+        return {
+            "audience_name": cohort.name,
+            "user_count": user_count,
+            "duplicate_count": sum(1 for user_id in cohort.user_ids if user_id) - user_count,
+            "batch_count": -(-user_count // self.batch_size),
+            "dry_run": True,
+            "status": "simulated_upload",
+            "sample_hash": [
+                sample[offset : offset + DIGEST_SIZE].hex() for offset in range(0, len(sample), DIGEST_SIZE)
+            ],
+        }
+
+    def _cached_hash_identifiers(self, cohort: AudienceCohort) -> bytes:
+        """Hash the cohort, reusing the result of a recent sync of the same identifiers."""
+        key = (self._salt_bytes, cohort.fingerprint())
+        hashed = self._hash_cache.get(key)
+        if hashed is not None:
+            self._hash_cache.move_to_end(key)
+            return hashed
+
+        hashed = self._hash_identifiers(cohort.user_ids)
+        if len(hashed) <= self.hash_cache_bytes:
+            self._hash_cache[key] = hashed
+            self._hash_cache_used += len(hashed)
+            while self._hash_cache_used > self.hash_cache_bytes:
+                _, evicted = self._hash_cache.popitem(last=False)
+                self._hash_cache_used -= len(evicted)
         return hashed
 
-    def _batch(self, items: List[str], size: int) -> Iterable[List[str]]:
-        for i in range(0, len(items), size):
-            yield items[i : i + size]
+    def _hash_identifiers(self, identifiers: Iterable[str]) -> bytes:
+        values = _normalize_identifiers(identifiers)
+        if len(values) < PARALLEL_HASH_THRESHOLD:
+            return _hash_chunk(values, self._salt_bytes)
+
+        # SHA-256 over short identifiers is dominated by per-item interpreter
+        # overhead, so large cohorts are sharded across processes.
+        chunks = [values[i : i + HASH_CHUNK_SIZE] for i in range(0, len(values), HASH_CHUNK_SIZE)]
+        with ProcessPoolExecutor() as pool:
+            return b"".join(pool.map(_hash_chunk, chunks, repeat(self._salt_bytes)))
+
+    def _batch(self, digests: bytes, size: int) -> Iterable[memoryview]:
+        view = memoryview(digests)
+        step = size * DIGEST_SIZE
+        for i in range(0, len(view), step):
+            yield view[i : i + step]
 
     def _create_or_get_user_list(self, cohort: AudienceCohort) -> str:
         """
@@ -155,35 +256,60 @@ class GoogleAdsAudienceConnector(AudienceConnector):
         )
         return response.results[0].resource_name
 
-    def _upload_batch(self, user_list_resource: str, batch: List[str]) -> Dict[str, Any]:
-        offline_user_data_job_service = self.client.get_service("OfflineUserDataJobService")
-        user_data_job = self.client.get_type("OfflineUserDataJob")
-        user_data_job.type_ = self.client.enums.OfflineUserDataJobTypeEnum.CUSTOMER_MATCH_USER_LIST
+    def _upload_with_retry(self, user_list_resource: str, batch: memoryview) -> Dict[str, Any]:
+        """
+        Upload one batch, retrying transient failures with exponential backoff.
+
+        The offline user data job is created once per batch; a retry resumes at
+        the step that failed rather than creating and running a duplicate job.
+        """
+        job_resource: Optional[str] = None
+        operations_added = False
+        attempt = 0
+        while True:
+            try:
+                if job_resource is None:
+                    job_resource = self._create_job(user_list_resource)
+                if not operations_added:
+                    self._add_job_operations(job_resource, batch)
+                    operations_added = True
+                self._run_job(job_resource)
+                return {"resource_name": job_resource, "uploaded": len(batch) // DIGEST_SIZE}
+            except Exception as exc:
+                if attempt >= self.upload_retries or not _is_transient(exc):
+                    raise ActivationError(f"Google Ads batch upload failed: {exc}") from exc
+                time.sleep(0.5 * 2**attempt)
+                attempt += 1
+
+    def _create_job(self, user_list_resource: str) -> str:
+        user_data_job = self._job_cls()
+        user_data_job.type_ = self._customer_match_job_type
         user_data_job.customer_match_user_list_metadata.user_list = user_list_resource
 
-        create_response = offline_user_data_job_service.create_offline_user_data_job(
+        create_response = self._job_service.create_offline_user_data_job(
             customer_id=self.credentials.get("customer_id"), job=user_data_job
         )
+        return create_response.resource_name
+
+    def _add_job_operations(self, job_resource: str, batch: memoryview) -> None:
+        operation_cls = self._job_operation_cls
+        identifier_cls = self._user_identifier_cls
         operations = []
-        for hashed in batch:
-            user_data = self.client.get_type("OfflineUserDataJobOperation")
-            user_identifier = self.client.get_type("UserIdentifier")
-            user_identifier.hashed_email = hashed
+        for offset in range(0, len(batch), DIGEST_SIZE):
+            user_data = operation_cls()
+            user_identifier = identifier_cls()
+            user_identifier.hashed_email = batch[offset : offset + DIGEST_SIZE].hex()
             user_data.create.user_identifiers.append(user_identifier)
             operations.append(user_data)
 
-        offline_user_data_job_service.add_offline_user_data_job_operations(
-            resource_name=create_response.resource_name,
+        self._job_service.add_offline_user_data_job_operations(
+            resource_name=job_resource,
             operations=operations,
             enable_partial_failure=True,
             enable_warnings=True,
         )
 
-        request = self.client.get_type("RunOfflineUserDataJobRequest")
-        request.resource_name = create_response.resource_name
-        offline_user_data_job_service.run_offline_user_data_job(request=request)
-
-        return {
-            "resource_name": create_response.resource_name,
-            "uploaded": len(batch),
-        }
+    def _run_job(self, job_resource: str) -> None:
+        request = self._run_job_request_cls()
+        request.resource_name = job_resource
+        self._job_service.run_offline_user_data_job(request=request)
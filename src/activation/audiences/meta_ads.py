@@ -9,10 +9,18 @@ from __future__ import annotations
 
 import hashlib
 import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import chain, islice
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional
+from threading import BoundedSemaphore
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+from urllib.parse import urlencode
 
-import yaml
+import orjson
+from requests.exceptions import ConnectionError as RequestsConnectionError
+from requests.exceptions import Timeout as RequestsTimeout
 
 try:  # pragma: no cover - optional dependency
     from facebook_business.adobjects.customaudience import CustomAudience  # type: ignore
@@ -22,6 +30,82 @@ except ImportError:  # pragma: no cover
     FacebookAdsApi = None  # type: ignore
 
 from ..base import ActivationContext, ActivationError, AudienceCohort, AudienceConnector
+from ..config_loader import load_yaml_config
+
+# SDK enum values resolved once instead of per audience/batch
+if CustomAudience is not None:  # pragma: no cover - requires facebook-business
+    _FIELD_NAME = CustomAudience.Field.name
+    _FIELD_SUBTYPE = CustomAudience.Field.subtype
+    _FIELD_DESCRIPTION = CustomAudience.Field.description
+    _SUBTYPE_CUSTOM = CustomAudience.Subtype.custom
+    _SCHEMA_EMAIL_SHA256 = CustomAudience.Schema.email_hash
+else:
+    _FIELD_NAME = _FIELD_SUBTYPE = _FIELD_DESCRIPTION = _SUBTYPE_CUSTOM = None
+    _SCHEMA_EMAIL_SHA256 = "EMAIL_SHA256"
+
+# Users payload template; only the comma-joined hex digests vary per batch.
+_PAYLOAD_PREFIX = '{"schema":%s,"data":["' % orjson.dumps(_SCHEMA_EMAIL_SHA256).decode("utf-8")
+_PAYLOAD_SUFFIX = '"]}'
+
+DIGEST_SIZE = hashlib.sha256().digest_size
+# Graph API accepts at most this many sub-requests in one batch call.
+GRAPH_BATCH_LIMIT = 50
+# Cohorts at least this large are hashed across worker processes.
+PARALLEL_HASH_THRESHOLD = 100_000
+# Hashed chunks in flight per worker process ahead of the uploader.
+HASH_LOOKAHEAD_PER_WORKER = 2
+# Graph API error codes for temporary failures and rate limiting.
+TRANSIENT_GRAPH_ERROR_CODES = frozenset({1, 2, 4, 17, 341})
+
+
+def _normalize_identifiers(identifiers: Iterable[str]) -> List[str]:
+    """Normalize identifiers and drop duplicates, keeping first-seen order."""
+    # strip()/lower() hit CPython's ASCII fast paths; a str.translate()
+    # lowercase table is an order of magnitude slower.
+    return list(dict.fromkeys(value.strip().lower() for value in identifiers if value))
+
+
+def _is_transient_status(http_status: Optional[int], error_code: Optional[int]) -> bool:
+    """Whether a Graph API failure is throttling or a server-side hiccup worth retrying."""
+    if http_status is not None and (http_status == 429 or http_status >= 500):
+        return True
+    return error_code in TRANSIENT_GRAPH_ERROR_CODES
+
+
+def _is_transient(exc: BaseException) -> bool:
+    """Whether a failed Graph API call is worth retrying."""
+    if isinstance(exc, (ConnectionError, TimeoutError, RequestsConnectionError, RequestsTimeout)):
+        return True
+    # FacebookRequestError exposes the HTTP status and Graph error code as methods.
+    http_status = getattr(exc, "http_status", None)
+    error_code = getattr(exc, "api_error_code", None)
+    return _is_transient_status(
+        http_status() if callable(http_status) else None,
+        error_code() if callable(error_code) else None,
+    )
+
+
+def _is_transient_response(response: Optional[Dict[str, Any]]) -> bool:
+    """Whether a failed Graph batch sub-request is worth re-sending."""
+    if not response:
+        # Graph returns null for sub-requests that did not complete in time.
+        return True
+    try:
+        error_code = orjson.loads(response.get("body") or "{}").get("error", {}).get("code")
+    except (orjson.JSONDecodeError, AttributeError):
+        error_code = None
+    return _is_transient_status(response.get("code"), error_code)
+
+
+def _hash_chunk(values: List[str], salt_bytes: bytes) -> bytes:
+    """Salt-hash a chunk of normalized identifiers (module-level so workers can unpickle it)."""
+    digests = bytearray()
+    salted = hashlib.sha256(salt_bytes)
+    for value in values:
+        hasher = salted.copy()
+        hasher.update(value.encode("utf-8"))
+        digests += hasher.digest()
+    return bytes(digests)
 
 
 class MetaAdsAudienceConnector(AudienceConnector):
@@ -38,8 +122,12 @@ class MetaAdsAudienceConnector(AudienceConnector):
         super().__init__()
         self.config = self._load_config(config_path)
         self.batch_size = int(self.config.get("batch_size", 5000))
+        self.upload_concurrency = max(1, int(self.config.get("upload_concurrency", 8)))
+        self.upload_retries = max(0, int(self.config.get("upload_retries", 3)))
         self.dry_run = dry_run if dry_run is not None else bool(self.config.get("dry_run", True))
         self.hashing_salt = self.config.get("hashing_salt", "")
+        self._salt_bytes = self.hashing_salt.encode("utf-8")
+        self._salted_hash = hashlib.sha256(self._salt_bytes)
         self.credentials = {
             "access_token": os.getenv("META_ACCESS_TOKEN") or self.config.get("access_token"),
             "app_secret": os.getenv("META_APP_SECRET") or self.config.get("app_secret"),
@@ -49,90 +137,212 @@ class MetaAdsAudienceConnector(AudienceConnector):
         if not self.dry_run and (CustomAudience is None or FacebookAdsApi is None):
             raise ActivationError("facebook-business SDK not installed or configured.")
 
+        self.api = None
         self.api_initialized = False
         if not self.dry_run and FacebookAdsApi:
             if not all(self.credentials.values()):
                 raise ActivationError(
                     "Missing Meta credentials. Set META_ACCESS_TOKEN / META_APP_SECRET / META_AD_ACCOUNT_ID."
                 )
-            FacebookAdsApi.init(
+            self.api = FacebookAdsApi.init(
                 access_token=self.credentials.get("access_token"),
                 app_secret=self.credentials.get("app_secret"),
             )
             self.api_initialized = True
 
     def sync(self, cohort: AudienceCohort, context: ActivationContext) -> Dict[str, Any]:
-        hashed = self._hash_identifiers(cohort.user_ids)
-        batches = list(self._batch(hashed, self.batch_size))
-        if not batches:
+        identifiers = _normalize_identifiers(cohort.user_ids)
+        duplicate_count = sum(1 for user_id in cohort.user_ids if user_id) - len(identifiers)
+        batches = self._hashed_batches(identifiers)
+        first_batch = next(batches, None)
+        if first_batch is None:
             raise ActivationError("Audience cohort contains no identifiers to sync.")
 
-        metadata = {
-            "audience_name": cohort.name,
-            "user_count": len(hashed),
-            "batch_count": len(batches),
-            "dry_run": self.dry_run,
-        }
-
         if self.dry_run:
-            metadata["status"] = "simulated_upload"
-            metadata["sample_hash"] = hashed[:3]
-            return metadata
+            user_count = len(first_batch) // DIGEST_SIZE
+            batch_count = 1
+            for batch in batches:
+                user_count += len(batch) // DIGEST_SIZE
+                batch_count += 1
+            return {
+                "audience_name": cohort.name,
+                "user_count": user_count,
+                "duplicate_count": duplicate_count,
+                "batch_count": batch_count,
+                "dry_run": self.dry_run,
+                "status": "simulated_upload",
+                "sample_hash": [
+                    first_batch[offset : offset + DIGEST_SIZE].hex()
+                    for offset in range(0, min(len(first_batch), 3 * DIGEST_SIZE), DIGEST_SIZE)
+                ],
+            }
 
         if not self.api_initialized:
             raise ActivationError("Meta API not initialized.")
 
         audience_id = self._create_or_get_audience(cohort)
-        operations = []
-        for batch in batches:
-            operations.append(self._upload_batch(audience_id, batch))
+        user_count = 0
+        batch_count = 0
+        futures = []
+        # Batches are sent GRAPH_BATCH_LIMIT at a time per HTTP round-trip. The
+        # next group is hashed while earlier ones upload; the semaphore caps how
+        # many hashed groups can be queued ahead of the workers.
+        slots = BoundedSemaphore(self.upload_concurrency)
+        with ThreadPoolExecutor(max_workers=self.upload_concurrency) as pool:
+            for group in self._batch(chain([first_batch], batches), GRAPH_BATCH_LIMIT):
+                user_count += sum(map(len, group)) // DIGEST_SIZE
+                batch_count += len(group)
+                slots.acquire()
+                future = pool.submit(self._upload_with_retry, audience_id, group)
+                future.add_done_callback(lambda _future: slots.release())
+                futures.append(future)
 
-        metadata["status"] = "uploaded"
-        metadata["audience_id"] = audience_id
-        metadata["operations"] = operations
-        return metadata
+        return {
+            "audience_name": cohort.name,
+            "user_count": user_count,
+            "duplicate_count": duplicate_count,
+            "batch_count": batch_count,
+            "dry_run": self.dry_run,
+            "status": "uploaded",
+            "audience_id": audience_id,
+            "operations": list(chain.from_iterable(future.result() for future in futures)),
+        }
 
     # ------------------------------------------------------------------
     # Helpers
     # ------------------------------------------------------------------
     def _load_config(self, path_str: str) -> Dict[str, Any]:
-        path = Path(path_str)
-        if not path.exists():
-            raise ActivationError(f"Audience config not found: {path_str}")
-        with path.open("r", encoding="utf-8") as f:
-            content = yaml.safe_load(f) or {}
-        return content.get("meta_ads", {})
-
-    def _hash_identifiers(self, identifiers: Iterable[str]) -> List[str]:
-        hashed = []
+        try:
+            content = load_yaml_config(Path(path_str))
+        except FileNotFoundError as exc:
+            raise ActivationError(f"Audience config not found: {path_str}") from exc
+        return dict(content.get("meta_ads", {}))
+
+    def _hash_identifiers(self, identifiers: Iterable[str]) -> Iterator[bytes]:
+        """
+        Yield raw 32-byte digests of normalized identifiers.
+
+        Hex encoding is left to the upload payload.
+        """
+        salted = self._salted_hash
         for value in identifiers:
-            if not value:
-                continue
-            normalized = value.strip().lower()
-            digest = hashlib.sha256((self.hashing_salt + normalized).encode("utf-8")).hexdigest()
-            hashed.append(digest)
-        return hashed
+            hasher = salted.copy()
+            hasher.update(value.encode("utf-8"))
+            yield hasher.digest()
+
+    def _hashed_batches(self, identifiers: List[str]) -> Iterator[bytes]:
+        """Yield packed digest buffers of up to ``batch_size`` identifiers each."""
+        if len(identifiers) < PARALLEL_HASH_THRESHOLD:
+            # Hashing is streamed batch by batch so only a few batches of digests are resident.
+            yield from self._packed_batches(self._hash_identifiers(identifiers), self.batch_size)
+            return
+
+        # SHA-256 over short identifiers is dominated by per-item interpreter
+        # overhead rather than the digest itself, so large cohorts are hashed
+        # one batch per task across processes; results arrive in batch order.
+        # Chunks are submitted with a bounded lookahead rather than all at once,
+        # so finished buffers cannot pile up ahead of a slow consumer.
+        size = self.batch_size
+        starts = iter(range(0, len(identifiers), size))
+        workers = os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            def submit(count: int) -> None:
+                for i in islice(starts, count):
+                    pending.append(pool.submit(_hash_chunk, identifiers[i : i + size], self._salt_bytes))
 
-    def _batch(self, items: List[str], size: int) -> Iterable[List[str]]:
-        for i in range(0, len(items), size):
-            yield items[i : i + size]
+            pending: deque = deque()
+            submit(HASH_LOOKAHEAD_PER_WORKER * workers)
+            try:
+                while pending:
+                    digests = pending.popleft().result()
+                    submit(1)
+                    yield digests
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    def _packed_batches(self, digests: Iterable[bytes], size: int) -> Iterator[bytearray]:
+        """Pack digests into contiguous buffers of up to ``size`` entries each."""
+        limit = size * DIGEST_SIZE
+        buffer = bytearray()
+        for digest in digests:
+            buffer += digest
+            if len(buffer) >= limit:
+                yield buffer
+                buffer = bytearray()
+        if buffer:
+            yield buffer
+
+    def _batch(self, items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+        iterator = iter(items)
+        while batch := list(islice(iterator, size)):
+            yield batch
 
     def _create_or_get_audience(self, cohort: AudienceCohort) -> str:
         """Create a Custom Audience for the cohort."""
         params = {
-            CustomAudience.Field.name: cohort.name,
-            CustomAudience.Field.subtype: CustomAudience.Subtype.custom,
-            CustomAudience.Field.description: cohort.description or "Intent-based audience",
+            _FIELD_NAME: cohort.name,
+            _FIELD_SUBTYPE: _SUBTYPE_CUSTOM,
+            _FIELD_DESCRIPTION: cohort.description or "Intent-based audience",
         }
         audience = CustomAudience(parent_id=self.credentials.get("account_id"))
         audience.remote_create(params=params)
         return audience.get_id()
 
-    def _upload_batch(self, audience_id: str, batch: List[str]) -> Dict[str, Any]:
-        audience = CustomAudience(audience_id)
-        payload = [{"match_keys": {"email": hashed}} for hashed in batch]
-        audience.add_users(
-            schema=CustomAudience.Schema.email_hash,
-            users=payload,
-        )
-        return {"audience_id": audience_id, "uploaded": len(batch)}
+    def _upload_with_retry(self, audience_id: str, group: List[bytearray]) -> List[Dict[str, Any]]:
+        """
+        Upload a group of batches, retrying transient failures with exponential backoff.
+
+        Only the sub-requests that failed transiently are re-sent, so batches
+        Meta already accepted are not uploaded twice; permanent failures (auth,
+        permissions, malformed payloads) raise immediately.
+        """
+        pending = list(range(len(group)))
+        attempt = 0
+        while True:
+            try:
+                responses = self._upload_group(audience_id, [group[i] for i in pending])
+            except Exception as exc:
+                if attempt >= self.upload_retries or not _is_transient(exc):
+                    raise ActivationError(f"Meta batch upload failed: {exc}") from exc
+            else:
+                if len(responses) != len(pending):
+                    raise ActivationError("Meta batch response is missing sub-request results.")
+                failed = []
+                for index, response in zip(pending, responses):
+                    if response and response.get("code") == 200:
+                        continue
+                    if attempt >= self.upload_retries or not _is_transient_response(response):
+                        raise ActivationError(f"Meta users upload rejected: {response}")
+                    failed.append(index)
+                if not failed:
+                    return [{"audience_id": audience_id, "uploaded": len(batch) // DIGEST_SIZE} for batch in group]
+                pending = failed
+            time.sleep(0.5 * 2**attempt)
+            attempt += 1
+
+    def _upload_group(self, audience_id: str, group: List[bytearray]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Add each batch to the audience as one sub-request of a single Graph API batch call.
+
+        Returns the per-sub-request responses in batch order.
+        """
+        relative_url = f"{audience_id}/users"
+        sub_requests = []
+        for batch in group:
+            # Hex digests need no JSON escaping, so the payload is assembled
+            # directly: one hex() call separates digests with "," and a single
+            # replace() turns that into the quoted string array.
+            payload = (
+                _PAYLOAD_PREFIX
+                + batch.hex(",", DIGEST_SIZE).replace(",", '","')
+                + _PAYLOAD_SUFFIX
+            )
+            sub_requests.append(
+                {
+                    "method": "POST",
+                    "relative_url": relative_url,
+                    "body": urlencode({"payload": payload}),
+                }
+            )
+        return self.api.call("POST", (), params={"batch": orjson.dumps(sub_requests).decode("utf-8")}).json()
@@ -9,7 +9,9 @@ the system can orchestrate them consistently (CLI, MCP, Gradio, or API).
 
 from __future__ import annotations
 
+import hashlib
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from typing import Any, Dict, Iterable, List, Optional
 
@@ -150,6 +152,11 @@ class ActivationPlaybook(ActivationComponent):
 
     Example: build audience + calculate bid modifiers + generate creative
     brief for a persona before syncing to downstream platforms.
+
+    With ``parallel=True`` components run concurrently on a thread pool, which
+    overlaps network-bound work (platform syncs, LLM calls). Components must
+    then be independent and must not mutate the shared context. Results are
+    merged in component order either way.
     """
 
     component_name = "activation_playbook"
@@ -159,14 +166,21 @@ class ActivationPlaybook(ActivationComponent):
         components: Iterable[ActivationComponent],
         *,
         enabled: bool = True,
+        parallel: bool = False,
     ) -> None:
         super().__init__(enabled=enabled)
         self.components = list(components)
+        self.parallel = parallel
 
     def execute(self, context: ActivationContext) -> ActivationResult:
+        if self.parallel and len(self.components) > 1:
+            with ThreadPoolExecutor(max_workers=len(self.components)) as pool:
+                results = list(pool.map(lambda component: component.run(context), self.components))
+        else:
+            results = [component.run(context) for component in self.components]
+
         master = ActivationResult()
-        for component in self.components:
-            result = component.run(context)
+        for component, result in zip(self.components, results):
             master.actions.extend(result.actions)
             master.diagnostics.extend(result.diagnostics)
             master.metadata.setdefault(component.component_name, result.metadata)
@@ -190,6 +204,19 @@ class AudienceCohort:
     user_ids: List[str]
     metadata: Dict[str, Any] = field(default_factory=dict)
 
+    def fingerprint(self) -> bytes:
+        """
+        SHA-256 digest of the identifier sequence.
+
+        Connectors use it as a cache key so re-syncing an unchanged cohort
+        can reuse previously hashed identifiers.
+        """
+        digest = hashlib.sha256()
+        for user_id in self.user_ids:
+            digest.update((user_id or "").encode("utf-8"))
+            digest.update(b"\x00")
+        return digest.digest()
+
 
 class AudienceConnector(ActivationComponent):
     """
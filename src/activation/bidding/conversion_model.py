@@ -9,11 +9,12 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, Optional, Sequence, Tuple
 
-import yaml
+import numpy as np
 
 from ..base import ActivationContext, IntentSignal
+from ..config_loader import load_yaml_config
 from ...intent.taxonomy import IntentTaxonomy
 
 
@@ -40,6 +41,22 @@ DEFAULT_WEIGHTS = {
 }
 
 
+def _uplift_adjustment(observed_cvr: float, base_cvr: float, weight: float) -> float:
+    """Multiplicative adjustment for an observed CVR relative to the baseline."""
+    uplift = (observed_cvr - base_cvr) / base_cvr if base_cvr > 0 else 0.0
+    return 1.0 + weight * uplift
+
+
+def _clamped_probability(
+    base_prob: float, adjustment: float, min_cvr: float, max_cvr: float
+) -> Tuple[float, float]:
+    """Apply the combined adjustment, clamp, and return (probability, lift vs base)."""
+    prob = base_prob * adjustment
+    prob = max(min_cvr, min(prob, max_cvr))
+    lift = ((prob - base_prob) / base_prob) if base_prob > 0 else 0.0
+    return prob, lift
+
+
 class ConversionModel:
     """
     Lightweight conversion estimator used for bid decisions.
@@ -57,12 +74,29 @@ class ConversionModel:
             label: definition.get("conversion_likelihood", 0.0)
             for label, definition in taxonomy.intents.items()
         }
+        self.intent_stage_map = {
+            label: (definition or {}).get("stage") for label, definition in taxonomy.intents.items()
+        }
         self.defaults = {**DEFAULT_LIMITS, **(defaults or {})}
         self.weights = {**DEFAULT_WEIGHTS}
         config = config or {}
         self.weights.update({k: v for k, v in config.items() if k in DEFAULT_WEIGHTS})
         self.stage_multipliers = config.get("stage_multipliers", {})
 
+        # Scalars read on every prediction, resolved once as plain floats
+        self._base_cvr = float(self.defaults["base_conversion_rate"])
+        self._min_cvr = float(self.defaults["min_conversion_rate"])
+        self._max_cvr = float(self.defaults["max_conversion_rate"])
+        self._neutral_confidence = float(self.defaults["neutral_confidence"])
+        self._confidence_weight = float(self.weights["confidence_weight"])
+        self._persona_weight = float(self.weights["persona_weight"])
+        self._historical_weight = float(self.weights["historical_weight"])
+        # Stage-adjusted base rate per intent, so predictions need one lookup
+        self._intent_base_cvr = {
+            label: self._stage_adjusted(conversion, self.intent_stage_map.get(label))
+            for label, conversion in self.intent_conversion_map.items()
+        }
+
     @classmethod
     def from_config(
         cls,
@@ -70,11 +104,10 @@ class ConversionModel:
         config_path: str,
     ) -> "ConversionModel":
         """Create model from YAML config (shared with bid optimizer)."""
-        config: Dict[str, Dict[str, float]] = {}
-        path = Path(config_path)
-        if path.exists():
-            with path.open("r", encoding="utf-8") as f:
-                config = yaml.safe_load(f) or {}
+        try:
+            config = load_yaml_config(Path(config_path))
+        except FileNotFoundError:
+            config = {}
         conversion_cfg = config.get("conversion_model", {})
         defaults = config.get("defaults", {})
         merged_defaults = {**DEFAULT_LIMITS, **defaults}
@@ -82,45 +115,102 @@ class ConversionModel:
 
     def predict(self, context: ActivationContext) -> ConversionEstimate:
         """Predict conversion probability for the provided context."""
-        base_prob = self._base_conversion(context.intents[0] if context.intents else None)
-        prob = base_prob
+        intent = context.intents[0] if context.intents else None
+        base_prob = self._base_conversion(intent)
         contributions: Dict[str, float] = {"base": base_prob}
+        adjustment = 1.0
 
-        if context.intents:
-            intent = context.intents[0]
+        if intent:
             confidence_adj = self._confidence_adjustment(intent)
-            prob *= confidence_adj
+            adjustment *= confidence_adj
             contributions["confidence"] = confidence_adj
 
         persona_adj = self._persona_adjustment(context)
-        prob *= persona_adj
+        adjustment *= persona_adj
         contributions["persona"] = persona_adj
 
         history_adj = self._historical_adjustment(context)
-        prob *= history_adj
+        adjustment *= history_adj
         contributions["historical"] = history_adj
 
-        prob = max(self.defaults["min_conversion_rate"], min(prob, self.defaults["max_conversion_rate"]))
-        lift = ((prob - base_prob) / base_prob) if base_prob > 0 else 0.0
+        prob, lift = _clamped_probability(base_prob, adjustment, self._min_cvr, self._max_cvr)
         return ConversionEstimate(probability=prob, lift_vs_baseline=lift, contributions=contributions)
 
+    def predict_batch(self, contexts: Sequence[ActivationContext]) -> np.ndarray:
+        """
+        Predict conversion probabilities for many contexts at once.
+
+        Element ``i`` equals ``predict(contexts[i]).probability``; the per-context
+        adjustments are evaluated as array arithmetic instead of one call each.
+        """
+        return self._batch_base_and_probability(contexts)[1]
+
+    def predict_lift_batch(self, contexts: Sequence[ActivationContext]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Batch counterpart of ``predict`` returning ``(probability, lift_vs_baseline)`` arrays.
+        """
+        base, prob = self._batch_base_and_probability(contexts)
+        lift = np.zeros_like(prob)
+        np.divide(prob - base, base, out=lift, where=base > 0)
+        return prob, lift
+
     # ------------------------------------------------------------------
     # Helpers
     # ------------------------------------------------------------------
 
+    def _batch_base_and_probability(self, contexts: Sequence[ActivationContext]) -> Tuple[np.ndarray, np.ndarray]:
+        count = len(contexts)
+        intents = [context.intents[0] if context.intents else None for context in contexts]
+        base = np.fromiter((self._base_conversion(intent) for intent in intents), dtype=np.float64, count=count)
+        confidence = np.fromiter(
+            (intent.confidence if intent else np.nan for intent in intents), dtype=np.float64, count=count
+        )
+        persona_cvr = np.fromiter(
+            (self._persona_cvr(context) for context in contexts), dtype=np.float64, count=count
+        )
+        historical_cvr = np.fromiter(
+            (self._historical_cvr(context) for context in contexts), dtype=np.float64, count=count
+        )
+
+        # Missing signals are NaN and fall back to a neutral 1.0 adjustment
+        default_base = self._base_cvr
+        uplift_scale = 1.0 / default_base if default_base > 0 else 0.0
+        confidence_adj = 1.0 + self._confidence_weight * np.nan_to_num(confidence - self._neutral_confidence)
+        persona_adj = 1.0 + self._persona_weight * np.nan_to_num((persona_cvr - default_base) * uplift_scale)
+        history_adj = 1.0 + self._historical_weight * np.nan_to_num(
+            (historical_cvr - default_base) * uplift_scale
+        )
+
+        prob = base * confidence_adj * persona_adj * history_adj
+        return base, np.clip(prob, self._min_cvr, self._max_cvr, out=prob)
+
     def _base_conversion(self, intent: Optional[IntentSignal]) -> float:
-        base = self.defaults["base_conversion_rate"]
         if intent:
-            base = self.intent_conversion_map.get(intent.label, base)
-            stage = self._intent_stage(intent.label)
-            if stage and stage in self.stage_multipliers:
-                base *= self.stage_multipliers[stage]
+            return self._intent_base_cvr.get(intent.label, self._base_cvr)
+        return self._base_cvr
+
+    def _stage_adjusted(self, base: float, stage: Optional[str]) -> float:
+        if stage and stage in self.stage_multipliers:
+            base *= self.stage_multipliers[stage]
         return base
 
     def _confidence_adjustment(self, intent: IntentSignal) -> float:
-        neutral = self.defaults["neutral_confidence"]
-        delta = intent.confidence - neutral
-        return 1.0 + self.weights["confidence_weight"] * delta
+        return 1.0 + self._confidence_weight * (intent.confidence - self._neutral_confidence)
+
+    @staticmethod
+    def _persona_cvr(context: ActivationContext) -> float:
+        """Persona conversion rate, or NaN when the persona does not report one."""
+        persona = context.persona
+        if not persona or not persona.metrics:
+            return np.nan
+        persona_cvr = persona.metrics.get("conversion_rate")
+        return np.nan if persona_cvr is None else persona_cvr
+
+    @staticmethod
+    def _historical_cvr(context: ActivationContext) -> float:
+        """Historical conversion rate, or NaN when no history is available."""
+        historical_cvr = (context.metrics or {}).get("historical_cvr")
+        return np.nan if historical_cvr is None else historical_cvr
 
     def _persona_adjustment(self, context: ActivationContext) -> float:
         persona = context.persona
@@ -129,21 +219,11 @@ class ConversionModel:
         persona_cvr = persona.metrics.get("conversion_rate")
         if persona_cvr is None:
             return 1.0
-        base = self.defaults["base_conversion_rate"]
-        uplift = (persona_cvr - base) / base if base > 0 else 0.0
-        return 1.0 + self.weights["persona_weight"] * uplift
+        return _uplift_adjustment(persona_cvr, self._base_cvr, self._persona_weight)
 
     def _historical_adjustment(self, context: ActivationContext) -> float:
         metrics = context.metrics or {}
         historical_cvr = metrics.get("historical_cvr")
         if historical_cvr is None:
             return 1.0
-        base = self.defaults["base_conversion_rate"]
-        uplift = (historical_cvr - base) / base if base > 0 else 0.0
-        return 1.0 + self.weights["historical_weight"] * uplift
-
-    def _intent_stage(self, intent_label: str) -> Optional[str]:
-        definition = self.taxonomy.get_intent_definition(intent_label)
-        if definition:
-            return definition.get("stage")
-        return None
+        return _uplift_adjustment(historical_cvr, self._base_cvr, self._historical_weight)
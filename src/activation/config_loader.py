@@ -0,0 +1,62 @@
+"""Shared YAML config loading for activation components."""
+
+from __future__ import annotations
+
+import os
+from functools import lru_cache
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Mapping
+
+import yaml
+
+try:  # libyaml-backed loader when PyYAML was built with it
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:  # pragma: no cover - pure-Python fallback
+    from yaml import SafeLoader as _YamlLoader  # type: ignore
+
+
+def _freeze(value: Any) -> Any:
+    """Recursively turn mappings into read-only views and lists into tuples."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _thaw(value: Any) -> Any:
+    """
+    Recursively copy frozen config back into plain dicts and lists.
+
+    Used wherever config values are handed to callers, so results stay
+    JSON-serializable and mutable without touching the shared parse.
+    """
+    if isinstance(value, Mapping):
+        return {key: _thaw(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_thaw(item) for item in value]
+    return value
+
+
+@lru_cache(maxsize=32)
+def _parse_yaml(path: str, mtime_ns: int) -> Mapping[str, Any]:
+    # Binary stream: the YAML reader detects the encoding itself
+    with open(path, "rb") as f:
+        return _freeze(yaml.load(f, Loader=_YamlLoader) or {})
+
+
+def load_yaml_config(path: Path) -> Mapping[str, Any]:
+    """
+    Parse a YAML config file, reusing the previous parse while it is unchanged.
+
+    The cache is keyed by resolved path and modification time, so connectors
+    and models built repeatedly from the same file share one parse. Because
+    the parse is shared, it is frozen: mappings at every level are read-only
+    views and lists become tuples.
+
+    Raises ``FileNotFoundError`` when the file does not exist, so callers need
+    no separate existence check.
+    """
+    mtime_ns = os.stat(path).st_mtime_ns
+    return _parse_yaml(os.path.abspath(path), mtime_ns)
@@ -2,13 +2,13 @@
 
 from __future__ import annotations
 
-import json
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Mapping, Optional
 
-import yaml
+import orjson
 
 from ..base import ActivationComponent, ActivationContext, ActivationError, ActivationResult
+from ..config_loader import _thaw, load_yaml_config
 from ...intent.llm_provider import BaseLLMProvider, LLMProviderFactory
 
 
@@ -31,7 +31,17 @@ class CreativeBriefGenerator(ActivationComponent):
         self._sections = self._config.get("brief_template", {}).get("sections", {})
         self._llm_config = self._config.get("llm", {})
         self._asset_preferences = self._config.get("asset_preferences", {})
+        # Prompt scaffolding is static per template; only the context JSON varies
+        sections_block = "\n".join(f"- {name}: {cfg.get('prompt')}" for name, cfg in self._sections.items())
+        self._prompt_head = (
+            "Given the marketing context below, craft a JSON object where each key matches the requested section name.\n"
+            "Context:\n"
+        )
+        self._prompt_tail = (
+            f"\nSections and guidance:\n{sections_block}\nRespond ONLY with JSON (section -> text)."
+        )
         self._llm_provider = llm_provider
+        self._provider_attempted = llm_provider is not None
         self._use_llm = use_llm
 
     def execute(self, context: ActivationContext) -> ActivationResult:
@@ -48,23 +58,22 @@ class CreativeBriefGenerator(ActivationComponent):
                 metadata={"intent": primary_intent.label},
             )
 
+        use_llm = self._should_use_llm()
         brief_sections = (
-            self._generate_with_llm(context, sections)
-            if self._should_use_llm()
-            else self._generate_from_template(sections)
+            self._generate_with_llm(context, sections) if use_llm else self._generate_from_template(sections)
         )
 
         action = {
             "type": "creative_brief",
             "intent": primary_intent.label,
             "sections": brief_sections,
-            "asset_preferences": asset_pref,
+            "asset_preferences": _thaw(asset_pref),
         }
         diagnostics = [
             f"Creative brief ready for intent '{primary_intent.label}' using "
-            f"{'LLM' if self._should_use_llm() else 'template'} mode."
+            f"{'LLM' if use_llm else 'template'} mode."
         ]
-        metadata = {"intent": primary_intent.label, "mode": "llm" if self._should_use_llm() else "template"}
+        metadata = {"intent": primary_intent.label, "mode": "llm" if use_llm else "template"}
         return ActivationResult(actions=[action], diagnostics=diagnostics, metadata=metadata)
 
     # Internal ----------------------------------------------------------------
@@ -74,6 +83,10 @@ class CreativeBriefGenerator(ActivationComponent):
     def _provider_available(self) -> bool:
         if self._llm_provider is not None:
             return True
+        if self._provider_attempted:
+            # Env-based creation already failed; stay in template mode.
+            return False
+        self._provider_attempted = True
         try:
             self._llm_provider = LLMProviderFactory.create_from_env()
         except Exception:  # noqa: BLE001 - fallback to template mode
@@ -85,7 +98,7 @@ class CreativeBriefGenerator(ActivationComponent):
             return self._generate_from_template(sections)
 
         payload = self._context_payload(context)
-        prompt = self._build_prompt(payload, sections)
+        prompt = self._build_prompt(payload)
         try:
             raw = self._llm_provider.generate_sync(
                 prompt=prompt,
@@ -104,20 +117,20 @@ class CreativeBriefGenerator(ActivationComponent):
     @staticmethod
     def _parse_llm_response(raw: str, sections: Dict[str, Any]) -> Dict[str, str]:
         try:
-            data = json.loads(raw)
+            data = orjson.loads(raw)
             if isinstance(data, dict):
                 return {k: str(v) for k, v in data.items()}
-        except json.JSONDecodeError:
+        except orjson.JSONDecodeError:
             pass
         # fallback: return single block of text mapped onto sections
         return {name: raw for name in sections}
 
     def _context_payload(self, context: ActivationContext) -> Dict[str, Any]:
-        persona = {
-            "name": context.persona.name if context.persona else None,
-            "description": context.persona.description if context.persona else None,
-            "metrics": context.persona.metrics if context.persona else None,
-        }
+        persona = context.persona
+        if persona is None:
+            persona_payload = {"name": None, "description": None, "metrics": None}
+        else:
+            persona_payload = {"name": persona.name, "description": persona.description, "metrics": persona.metrics}
         metadata = context.metadata or {}
         return {
             "intent": {
@@ -125,28 +138,19 @@ class CreativeBriefGenerator(ActivationComponent):
                 "confidence": context.intents[0].confidence,
                 "evidence": context.intents[0].evidence,
             },
-            "persona": persona,
+            "persona": persona_payload,
             "metrics": context.metrics,
             "metadata": metadata,
         }
 
-    @staticmethod
-    def _build_prompt(payload: Dict[str, Any], sections: Dict[str, Any]) -> str:
-        prompt_lines = [
-            "Given the marketing context below, craft a JSON object where each key matches the requested section name.",
-            "Context:",
-            json.dumps(payload, indent=2),
-            "Sections and guidance:",
-        ]
-        for name, cfg in sections.items():
-            prompt_lines.append(f"- {name}: {cfg.get('prompt')}")
-        prompt_lines.append("Respond ONLY with JSON (section -> text).")
-        return "\n".join(prompt_lines)
+    def _build_prompt(self, payload: Dict[str, Any]) -> str:
+        # Compact JSON: the model does not need indentation, and it keeps the prompt short
+        context_json = orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+        return self._prompt_head + context_json.decode("utf-8") + self._prompt_tail
 
     @staticmethod
-    def _load_config(path_str: str) -> Dict[str, Any]:
-        path = Path(path_str)
-        if not path.exists():
-            raise ActivationError(f"Creative configuration not found at {path_str}")
-        with path.open("r", encoding="utf-8") as handle:
-            return yaml.safe_load(handle) or {}
+    def _load_config(path_str: str) -> Mapping[str, Any]:
+        try:
+            return load_yaml_config(Path(path_str))
+        except FileNotFoundError as exc:
+            raise ActivationError(f"Creative configuration not found at {path_str}") from exc
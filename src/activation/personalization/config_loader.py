@@ -3,15 +3,14 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Mapping
 
-import yaml
+from ..config_loader import load_yaml_config
 
 
-def load_personalization_config(path: str) -> Dict[str, Any]:
-    """Load YAML configuration for personalization engines."""
-    file_path = Path(path)
-    if not file_path.exists():
+def load_personalization_config(path: str) -> Mapping[str, Any]:
+    """Load YAML configuration for personalization engines (shared, read-only)."""
+    try:
+        return load_yaml_config(Path(path))
+    except FileNotFoundError:
         return {}
-    with file_path.open("r", encoding="utf-8") as handle:
-        return yaml.safe_load(handle) or {}
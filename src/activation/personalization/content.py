@@ -2,12 +2,16 @@
 
 from __future__ import annotations
 
-import copy
-from typing import Any, Dict, List
+from types import MappingProxyType
+from typing import Any, Dict, FrozenSet, List, Mapping, Optional, Tuple
 
 from ..base import ActivationComponent, ActivationContext, ActivationError, ActivationResult
+from ..config_loader import _thaw
 from .config_loader import load_personalization_config
 
+# Shared stand-in for absent metadata/config sections; read-only so it can't leak state
+_EMPTY: Mapping[str, Any] = MappingProxyType({})
+
 
 class ContentPersonalizationEngine(ActivationComponent):
     """Assigns content slots/variants using YAML rules + context metadata."""
@@ -25,16 +29,50 @@ class ContentPersonalizationEngine(ActivationComponent):
         self._config = load_personalization_config(config_path)
         self._slots = self._config.get("slots", {})
         self._offers = self._config.get("offers", {})
+        self._offer_payloads = {name: self._offer_payload(name, cfg) for name, cfg in self._offers.items()}
+        # Candidate offers per intent, in config order; unrestricted offers are
+        # interleaved at their original position so precedence is unchanged.
+        self._offers_any_intent: Tuple[Tuple[str, Dict[str, Any]], ...] = tuple(
+            (name, cfg) for name, cfg in self._offers.items() if not cfg.get("intents")
+        )
+        intent_labels = {label for cfg in self._offers.values() for label in cfg.get("intents") or ()}
+        self._offers_by_intent: Dict[str, Tuple[Tuple[str, Dict[str, Any]], ...]] = {
+            label: tuple(
+                (name, cfg)
+                for name, cfg in self._offers.items()
+                if not cfg.get("intents") or label in cfg["intents"]
+            )
+            for label in intent_labels
+        }
         self._channel_rules = self._config.get("channel_rules", {})
+        # Slot ordering and intent gates are fixed after construction
+        self._default_slot_order: Tuple[str, ...] = tuple(self._slots)
+        self._channel_slot_order: Dict[str, Tuple[str, ...]] = {
+            channel: tuple(self._slot_order_for_channel(channel)) for channel in self._channel_rules
+        }
+        self._slot_allowed: Dict[str, Optional[FrozenSet[str]]] = {
+            slot_id: frozenset(slot_cfg["allowed_intents"])
+            if isinstance(slot_cfg, Mapping) and slot_cfg.get("allowed_intents")
+            else None
+            for slot_id, slot_cfg in self._slots.items()
+        }
+        self._has_any_rules = bool(self._slots) or bool(self._offers)
 
     def execute(self, context: ActivationContext) -> ActivationResult:
         if not context.intents:
             raise ActivationError("Content personalization requires at least one intent signal.")
 
         primary_intent = context.intents[0]
-        preferred_channels = self._preferred_channels(context)
-        constraints = self._gather_constraints(context)
-        personalization_meta = (context.metadata or {}).get("personalization_context") or {}
+        if not self._has_any_rules:
+            return ActivationResult(
+                diagnostics=["No personalization rules configured; skipping."],
+                metadata={"intent": primary_intent.label},
+            )
+
+        request_meta = context.metadata or _EMPTY
+        preferred_channels = self._preferred_channels(request_meta)
+        constraints = self._gather_constraints(request_meta)
+        personalization_meta = request_meta.get("personalization_context") or _EMPTY
         available_slots = personalization_meta.get("available_slots")
         if isinstance(available_slots, list) and available_slots:
             available_set = {slot for slot in available_slots if isinstance(slot, str)}
@@ -45,15 +83,15 @@ class ContentPersonalizationEngine(ActivationComponent):
         diagnostics: List[str] = []
 
         for channel in preferred_channels:
-            slot_ids = self._slot_order_for_channel(channel)
+            slot_ids = self._channel_slot_order.get(channel, self._default_slot_order)
             if available_set:
                 slot_ids = [slot_id for slot_id in slot_ids if slot_id in available_set]
             for slot_id in slot_ids:
                 slot_cfg = self._slots.get(slot_id)
                 if not slot_cfg:
                     continue
-                allowed = slot_cfg.get("allowed_intents")
-                if allowed and primary_intent.label not in allowed:
+                allowed = self._slot_allowed[slot_id]
+                if allowed is not None and primary_intent.label not in allowed:
                     continue
                 content = self._build_slot_content(slot_cfg, constraints)
                 if not content:
@@ -80,8 +118,7 @@ class ContentPersonalizationEngine(ActivationComponent):
         return ActivationResult(actions=actions, diagnostics=diagnostics, metadata=metadata)
 
     # Helpers -----------------------------------------------------------------
-    def _preferred_channels(self, context: ActivationContext) -> List[str]:
-        metadata = context.metadata or {}
+    def _preferred_channels(self, metadata: Mapping[str, Any]) -> List[str]:
         preferred = metadata.get("preferred_channels")
         if isinstance(preferred, list) and preferred:
             return [str(ch).lower() for ch in preferred]
@@ -97,50 +134,55 @@ class ContentPersonalizationEngine(ActivationComponent):
             return [slot for slot in priority if slot in self._slots]
         return list(self._slots.keys())
 
-    def _gather_constraints(self, context: ActivationContext) -> Dict[str, Any]:
-        constraints: Dict[str, Any] = {}
-        metadata = context.metadata or {}
-        from_meta = metadata.get("personalization_context", {})
-        if isinstance(from_meta, dict):
-            meta_constraints = from_meta.get("constraints")
-            if isinstance(meta_constraints, dict):
-                constraints.update(meta_constraints)
-
+    def _gather_constraints(self, metadata: Mapping[str, Any]) -> Mapping[str, Any]:
+        sources = []
+        from_meta = metadata.get("personalization_context")
+        if isinstance(from_meta, dict) and isinstance(from_meta.get("constraints"), dict):
+            sources.append(from_meta["constraints"])
         preview = metadata.get("context_preview")
-        if isinstance(preview, dict):
-            constraint_signals = preview.get("constraint_signals")
-            if isinstance(constraint_signals, dict):
-                constraints.update(constraint_signals)
+        if isinstance(preview, dict) and isinstance(preview.get("constraint_signals"), dict):
+            sources.append(preview["constraint_signals"])
+        if not sources:
+            return _EMPTY
+
+        constraints: Dict[str, Any] = {}
+        for source in sources:
+            constraints.update(source)
         return constraints
 
-    def _build_slot_content(self, slot_cfg: Dict[str, Any], constraints: Dict[str, Any]) -> Dict[str, Any]:
-        base_content = copy.deepcopy(slot_cfg.get("default_content") or {})
-        overrides = slot_cfg.get("constraint_overrides") or {}
+    def _build_slot_content(self, slot_cfg: Dict[str, Any], constraints: Mapping[str, Any]) -> Dict[str, Any]:
+        # Config is frozen and shared, so content is thawed into fresh
+        # dicts/lists at every depth before it reaches callers.
+        base_content = _thaw(slot_cfg.get("default_content") or _EMPTY)
+        overrides = slot_cfg.get("constraint_overrides") or _EMPTY
         for constraint_key, override in overrides.items():
             is_active = constraints.get(constraint_key)
             if is_active:
-                base_content.update(override)
+                base_content.update(_thaw(override))
         return base_content
 
     def _select_offer(self, context: ActivationContext, intent) -> Dict[str, Any]:
-        persona_metrics = (context.persona.metrics if context.persona and context.persona.metrics else {}) or {}
-        for name, cfg in self._offers.items():
-            intents = cfg.get("intents")
-            if intents and intent.label not in intents:
-                continue
-            conditions = cfg.get("persona_conditions") or {}
+        persona_metrics = (context.persona.metrics if context.persona else None) or _EMPTY
+        candidates = self._offers_by_intent.get(intent.label, self._offers_any_intent)
+        for name, cfg in candidates:
+            conditions = cfg.get("persona_conditions") or _EMPTY
             if not self._conditions_met(conditions, persona_metrics):
                 continue
-            recommendation = {
-                "name": name,
-                "description": cfg.get("recommendation", {}).get("description"),
-                "mode": cfg.get("recommendation", {}).get("type"),
-            }
-            return {k: v for k, v in recommendation.items() if v}
+            return _thaw(self._offer_payloads[name])
         return {}
 
     @staticmethod
-    def _conditions_met(conditions: Dict[str, Any], metrics: Dict[str, Any]) -> bool:
+    def _offer_payload(name: str, cfg: Dict[str, Any]) -> Dict[str, Any]:
+        recommendation = cfg.get("recommendation", {})
+        payload = {
+            "name": name,
+            "description": recommendation.get("description"),
+            "mode": recommendation.get("type"),
+        }
+        return {k: v for k, v in payload.items() if v}
+
+    @staticmethod
+    def _conditions_met(conditions: Mapping[str, Any], metrics: Mapping[str, Any]) -> bool:
         if not conditions:
             return True
         min_ltv = conditions.get("min_ltv_index")
@@ -2,9 +2,10 @@
 
 from __future__ import annotations
 
-from typing import Any, Dict, List
+from typing import Any, Dict, Tuple
 
 from ..base import ActivationComponent, ActivationContext, ActivationError, ActivationResult
+from ..config_loader import _thaw
 from .config_loader import load_personalization_config
 
 
@@ -23,39 +24,44 @@ class TriggeredEmailPlanner(ActivationComponent):
         self.config_path = config_path
         self._config = load_personalization_config(config_path)
         self._playbooks = self._config.get("email_playbooks", {})
+        self._prepared: Dict[str, Dict[str, Any]] = {
+            intent: self._prepare_playbook(playbook) for intent, playbook in self._playbooks.items() if playbook
+        }
 
     def execute(self, context: ActivationContext) -> ActivationResult:
         if not context.intents:
             raise ActivationError("Email planner requires at least one intent.")
 
         primary_intent = context.intents[0].label
-        playbook = self._playbooks.get(primary_intent) or self._playbooks.get("default")
-        if not playbook:
+        prepared = self._prepared.get(primary_intent) or self._prepared.get("default")
+        if prepared is None:
             return ActivationResult(
                 diagnostics=[f"No email playbook configured for intent '{primary_intent}'."]
             )
 
-        steps = self._format_steps(playbook.get("steps", []))
+        steps_count = prepared["steps_count"]
         action = {
             "type": "email_playbook",
             "intent": primary_intent,
-            "subject": playbook.get("subject"),
-            "delay_minutes": playbook.get("delay_minutes", 60),
-            "steps": steps,
+            "subject": _thaw(prepared["subject"]),
+            "delay_minutes": prepared["delay_minutes"],
+            # Fresh step dicts so callers never share the prepared playbook
+            "steps": _thaw(prepared["steps"]),
         }
 
-        diagnostics = [f"Email playbook prepared for {primary_intent} ({len(steps)} steps)."]
-        metadata: Dict[str, Any] = {"intent": primary_intent, "steps_count": len(steps)}
+        diagnostics = [f"Email playbook prepared for {primary_intent} ({steps_count} steps)."]
+        metadata: Dict[str, Any] = {"intent": primary_intent, "steps_count": steps_count}
         return ActivationResult(actions=[action], diagnostics=diagnostics, metadata=metadata)
 
     @staticmethod
-    def _format_steps(raw_steps: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        formatted: List[Dict[str, Any]] = []
-        for step in raw_steps:
-            formatted.append(
-                {
-                    "type": step.get("type"),
-                    "message": step.get("message"),
-                }
-            )
-        return formatted
+    def _prepare_playbook(playbook: Dict[str, Any]) -> Dict[str, Any]:
+        """Format a playbook's steps once; the config does not change after load."""
+        steps: Tuple[Dict[str, Any], ...] = tuple(
+            {"type": step.get("type"), "message": step.get("message")} for step in playbook.get("steps", [])
+        )
+        return {
+            "subject": playbook.get("subject"),
+            "delay_minutes": playbook.get("delay_minutes", 60),
+            "steps": steps,
+            "steps_count": len(steps),
+        }
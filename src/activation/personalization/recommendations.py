@@ -5,6 +5,7 @@ from __future__ import annotations
 from typing import Any, Dict, List
 
 from ..base import ActivationComponent, ActivationContext, ActivationError, ActivationResult
+from ..config_loader import _thaw
 from .config_loader import load_personalization_config
 
 
@@ -29,6 +30,12 @@ class RecommendationSelector(ActivationComponent):
             raise ActivationError("Recommendation selector requires an intent signal.")
 
         primary_intent = context.intents[0].label
+        if not self._rules:
+            return ActivationResult(
+                diagnostics=["No recommendation rules configured; skipping."],
+                metadata={"source": "recommendation_rules", "intent": primary_intent},
+            )
+
         intents_cfg = (self._rules.get("intents") or {}).get(primary_intent, [])
         default_cfg = self._rules.get("default", [])
 
@@ -43,7 +50,7 @@ class RecommendationSelector(ActivationComponent):
                 "label": candidate.get("label"),
                 "description": candidate.get("description"),
             }
-            actions.append(action)
+            actions.append(_thaw(action))
             diagnostics.append(f"Recommendation '{candidate.get('id')}' proposed for {primary_intent}.")
 
         metadata: Dict[str, Any] = {"source": "recommendation_rules", "intent": primary_intent}
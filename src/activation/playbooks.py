@@ -32,6 +32,7 @@ class Layer4ActivationPlaybook(ActivationPlaybook):
         bid_component: Optional[ActivationComponent] = None,
         enabled: bool = True,
         use_llm_brief: bool = True,
+        parallel: bool = False,
     ) -> None:
         components = [
             ContentPersonalizationEngine(),
@@ -41,4 +42,4 @@ class Layer4ActivationPlaybook(ActivationPlaybook):
         ]
         if include_bidding:
             components.append(bid_component or IntentAwareBidOptimizer())
-        super().__init__(components, enabled=enabled)
+        super().__init__(components, enabled=enabled, parallel=parallel)
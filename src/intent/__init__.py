@@ -2,6 +2,8 @@
 
 from .engine import IntentRecognitionEngine
 from .taxonomy import IntentTaxonomy
+from .result_cache import CacheBackend, RedisResultCache, ResultCache
+from .semantic_cache import SemanticCache
 from .llm_provider import (
     BaseLLMProvider,
     AnthropicProvider,
@@ -13,6 +15,10 @@ from .llm_provider import (
 __all__ = [
     "IntentRecognitionEngine",
     "IntentTaxonomy",
+    "CacheBackend",
+    "ResultCache",
+    "RedisResultCache",
+    "SemanticCache",
     "BaseLLMProvider",
     "AnthropicProvider",
     "OpenAIProvider",
@@ -0,0 +1,44 @@
+"""
+Process-wide sentence encoder.
+
+Loading a sentence-transformers model takes seconds and hundreds of MB, so the
+semantic cache and the behavioral embedder share one instance per model name
+instead of each engine, cache or tool call loading its own copy.
+"""
+
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+_MODELS: Dict[Tuple[Callable[[str], Any], str], Any] = {}
+_LOCK = threading.Lock()
+
+
+def get_sentence_encoder(
+    model_name: str = "all-MiniLM-L6-v2",
+    loader: Optional[Callable[[str], Any]] = None,
+) -> Any:
+    """
+    Return the shared model for ``model_name``, loading it on first use.
+
+    Args:
+        model_name: Sentence transformer model name
+        loader: Model constructor (defaults to ``SentenceTransformer``, which
+                picks the GPU when one is available)
+
+    Returns:
+        The loaded model; concurrent first calls load it only once
+    """
+    if loader is None:
+        from sentence_transformers import SentenceTransformer
+
+        loader = SentenceTransformer
+
+    key = (loader, model_name)
+    model = _MODELS.get(key)
+    if model is None:
+        with _LOCK:
+            model = _MODELS.get(key)
+            if model is None:
+                model = _MODELS[key] = loader(model_name)
+    return model
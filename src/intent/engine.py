@@ -7,14 +7,159 @@ situational context to activate the submanifolds of the model's latent space tha
 human social-goal patterns.
 """
 
+import asyncio
+import bisect
+import hashlib
+import inspect
 import json
-from typing import Dict, Any, Optional
+import re
+from typing import Dict, Any, List, NamedTuple, Optional, Pattern, Set, Tuple, Union
+
+import numpy as np
+import orjson
 
 from .taxonomy import IntentTaxonomy
 from .llm_provider import BaseLLMProvider, LLMProviderFactory
+from .result_cache import CacheBackend, ResultCache
+from .semantic_cache import SemanticCache
 from ..utils.context_builder import ContextBuilder
 
 
+# Placeholders in the prompt template that receive the formatted user context.
+_CONTEXT_PLACEHOLDERS = (
+    "{identity_context}",
+    "{historical_context}",
+    "{situational_context}",
+    "{behavioral_signals}",
+    "{temporal_signals}",
+    "{constraint_signals}",
+    "{context}",
+)
+_CONTEXT_SLOT = "\x00context\x00"
+
+_SYSTEM_PROMPT = "You are an expert behavioral analyst for digital marketing."
+
+# Lower bounds (seconds) of the time-on-page buckets used by the bucketed cache tier.
+_TIME_ON_PAGE_BUCKETS = (0, 10, 30, 60, 120, 300)
+
+
+_JSON_DECODER = json.JSONDecoder()
+
+
+def _extract_json_object(text: str) -> Optional[Dict[str, Any]]:
+    """
+    Return the first complete JSON object embedded in ``text``, if any.
+
+    A bare JSON reply is decoded directly. Otherwise each ``{`` is tried in
+    turn with ``raw_decode``, whose C scanner tracks nesting and string
+    escapes and stops at the matching brace, so prose or a second object
+    after the first one does not break the parse.
+    """
+    stripped = text.strip()
+    if stripped.startswith("{"):
+        try:
+            parsed = orjson.loads(stripped)
+            if isinstance(parsed, dict):
+                return parsed
+        except orjson.JSONDecodeError:
+            pass
+
+    start = text.find("{")
+    while start != -1:
+        try:
+            parsed, _ = _JSON_DECODER.raw_decode(text, start)
+            return parsed
+        except ValueError:
+            start = text.find("{", start + 1)
+    return None
+
+
+class _PendingRequest(NamedTuple):
+    """State carried across the LLM call for one recognition request."""
+
+    context: Dict[str, Any]
+    cache_key: str
+    bucket_key: Optional[str]
+    embedding: Optional[np.ndarray]
+    stable_prefix: str
+    prompt: str
+
+
+def _accepts_keyword(method: Any, name: str) -> bool:
+    """Whether ``method`` can be called with the keyword argument ``name``."""
+    try:
+        parameters = inspect.signature(method).parameters.values()
+    except (TypeError, ValueError):
+        return False
+    return any(p.name == name or p.kind is inspect.Parameter.VAR_KEYWORD for p in parameters)
+
+
+class _BatchScheduler:
+    """
+    Coalesces LLM calls issued within a short window.
+
+    Callers enqueue prompts; a background task waits ``window`` seconds after
+    the first arrival, drains everything queued meanwhile and fires the whole
+    batch at the provider concurrently with ``asyncio.gather``.
+    """
+
+    def __init__(self, llm: BaseLLMProvider, window: float):
+        self.llm = llm
+        self.window = window
+        # Providers predating prompt caching get the prefix prepended instead
+        self._pass_prefix = _accepts_keyword(llm.generate, "cacheable_prefix")
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._in_flight: Set[asyncio.Task] = set()
+
+    async def submit(self, prompt: str, system_prompt: str, cacheable_prefix: str) -> str:
+        """Queue one prompt and wait for its response."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Queues and tasks are bound to the loop they were created on
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = None
+
+        future = loop.create_future()
+        self._queue.put_nowait(((prompt, system_prompt, cacheable_prefix), future))
+        if self._worker is None or self._worker.done():
+            self._worker = loop.create_task(self._collect())
+        return await future
+
+    async def _collect(self) -> None:
+        while not self._queue.empty():
+            await asyncio.sleep(self.window)
+            batch = []
+            while not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            # Dispatch without awaiting so the next window opens immediately
+            task = asyncio.create_task(self._dispatch(batch))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    async def _generate(self, prompt: str, system_prompt: str, cacheable_prefix: str) -> str:
+        # Awaited inside a coroutine so even a provider that raises before
+        # returning its awaitable fails only its own request, via gather
+        if self._pass_prefix:
+            return await self.llm.generate(prompt, system_prompt, cacheable_prefix=cacheable_prefix)
+        return await self.llm.generate(cacheable_prefix + prompt, system_prompt)
+
+    async def _dispatch(self, batch: List[Tuple[Tuple[str, str, str], asyncio.Future]]) -> None:
+        responses = await asyncio.gather(
+            *(self._generate(*args) for args, _ in batch),
+            return_exceptions=True,
+        )
+        for (_, future), response in zip(batch, responses):
+            if future.done():  # caller was cancelled
+                continue
+            if isinstance(response, BaseException):
+                future.set_exception(response)
+            else:
+                future.set_result(response)
+
+
 class IntentRecognitionEngine:
     """
     Core engine for recognizing user intent from behavioral context.
@@ -27,7 +172,13 @@ class IntentRecognitionEngine:
         llm_provider: Optional[BaseLLMProvider] = None,
         taxonomy: Optional[IntentTaxonomy] = None,
         prompt_template_path: str = "config/prompts/intent_classification.txt",
-        enable_caching: bool = True
+        enable_caching: bool = True,
+        enable_semantic_cache: bool = False,
+        semantic_cache: Optional[SemanticCache] = None,
+        batch_window: float = 0.1,
+        cache_size: int = 10_000,
+        cache_ttl: Optional[float] = 3600.0,
+        cache_backend: Optional[CacheBackend] = None
     ):
         """
         Initialize the intent recognition engine.
@@ -37,23 +188,62 @@ class IntentRecognitionEngine:
             taxonomy: Intent taxonomy (defaults to ecommerce)
             prompt_template_path: Path to prompt template
             enable_caching: Whether to cache results (simplified for hackathon)
+            enable_semantic_cache: Also reuse results for near-identical contexts
+                                   (embedding similarity) instead of only exact matches
+            semantic_cache: Preconfigured semantic cache (implies enable_semantic_cache)
+            batch_window: Seconds ``recognize_intent_async`` waits to coalesce
+                          concurrent requests into one provider dispatch
+            cache_size: Maximum number of results kept in the exact cache
+            cache_ttl: Seconds a cached result stays valid (None disables expiry)
+            cache_backend: Storage for the exact cache, e.g. ``RedisResultCache``
+                           to share results across workers (defaults to an
+                           in-process ``ResultCache``)
         """
         # Initialize LLM provider
         self.llm = llm_provider or LLMProviderFactory.create_from_env()
 
-        # Initialize taxonomy
-        self.taxonomy = taxonomy or IntentTaxonomy.from_domain("ecommerce")
-
         # Load prompt template
         self.prompt_template = self._load_prompt_template(prompt_template_path)
 
+        # Initialize taxonomy (also bakes it into the prompt, see the setter)
+        self.taxonomy = taxonomy or IntentTaxonomy.from_domain("ecommerce")
+
         # Initialize context builder
         self.context_builder = ContextBuilder()
 
-        # Simple in-memory cache (replace with Redis in production)
-        self.cache: Optional[Dict[str, Dict[str, Any]]] = {} if enable_caching else None
+        # Bounded in-memory cache (replace with Redis in production)
+        if cache_backend is None and enable_caching:
+            cache_backend = ResultCache(cache_size, cache_ttl)
+        self.cache: Optional[CacheBackend] = cache_backend if enable_caching else None
         self.enable_caching = enable_caching
 
+        # Similarity-based cache consulted after an exact-cache miss
+        if semantic_cache is None and enable_semantic_cache:
+            semantic_cache = SemanticCache()
+        self.semantic_cache = semantic_cache
+        self._bucket_cache = ResultCache(cache_size, cache_ttl)
+
+        # Providers written before prompt caching take no cacheable_prefix;
+        # the prefix is prepended to their prompt instead
+        self._pass_prefix = _accepts_keyword(self.llm.generate_sync, "cacheable_prefix")
+
+        # Coalesces concurrent recognize_intent_async calls
+        self._batch_scheduler = _BatchScheduler(self.llm, batch_window)
+        self._inflight: Dict[str, "asyncio.Task[Dict[str, Any]]"] = {}
+
+    @property
+    def taxonomy(self) -> IntentTaxonomy:
+        """Intent taxonomy the engine classifies against."""
+        return self._taxonomy
+
+    @taxonomy.setter
+    def taxonomy(self, taxonomy: IntentTaxonomy) -> None:
+        # Everything derived from the taxonomy is rebuilt here, once per swap
+        self._taxonomy = taxonomy
+        self._prompt_segments = self._compile_prompt_template(self.prompt_template)
+        self._intent_label_pattern, self._intent_label_rank = self._compile_intent_matcher()
+        self._cache_namespace = self._compile_cache_namespace()
+
     def _load_prompt_template(self, path: str) -> str:
         """Load the prompt template from file."""
         try:
@@ -70,12 +260,12 @@ You are an expert behavioral analyst specializing in customer intent recognition
 
 Analyze the following context and identify the user's primary intent.
 
-=== USER CONTEXT ===
-{context}
-
 === INTENT TAXONOMY ===
 {intent_definitions}
 
+=== USER CONTEXT ===
+{context}
+
 Provide your analysis in JSON format with these fields:
 - primary_intent
 - confidence (0.0 to 1.0)
@@ -124,8 +314,7 @@ Provide your analysis:
                 "conversion_probability": float
             }
         """
-        # Step 1: Build structured context
-        context = self.context_builder.build_context(
+        request = self._prepare_request(
             user_query=user_query,
             page_type=page_type,
             previous_actions=previous_actions,
@@ -133,64 +322,170 @@ Provide your analysis:
             session_history=session_history,
             **kwargs
         )
+        if isinstance(request, dict):
+            return request
 
-        # Step 2: Check cache
-        cache_key = self._generate_cache_key(context)
-        if self.enable_caching and self.cache is not None and cache_key in self.cache:
-            return self.cache[cache_key]
-
-        # Step 3: Format context for LLM
-        context_formatted = self.context_builder.format_for_llm(context)
+        # Step 5: Get LLM inference
+        try:
+            if self._pass_prefix:
+                raw_response = self.llm.generate_sync(
+                    prompt=request.prompt,
+                    system_prompt=_SYSTEM_PROMPT,
+                    cacheable_prefix=request.stable_prefix
+                )
+            else:
+                raw_response = self.llm.generate_sync(
+                    prompt=request.stable_prefix + request.prompt,
+                    system_prompt=_SYSTEM_PROMPT
+                )
+            return self._finish_request(request, raw_response)
 
-        # Step 4: Build complete prompt
-        prompt = self._build_prompt(context_formatted)
+        except Exception as e:
+            # Return error state with fallback
+            return self._fallback_response(str(e))
 
-        # Step 5: Get LLM inference
+    async def recognize_intent_async(
+        self,
+        user_query: str = "",
+        page_type: str = "",
+        previous_actions: str = "",
+        time_on_page: int = 0,
+        session_history: str = "",
+        **kwargs
+    ) -> Dict[str, Any]:
+        """
+        Async variant of ``recognize_intent`` for concurrent callers.
+
+        Requests arriving within the engine's batching window are dispatched
+        to the provider together, so N concurrent requests cost roughly one
+        provider round trip instead of N sequential ones, and identical
+        requests already in flight wait for that call instead of repeating it.
+        Takes the same arguments and returns the same structure as
+        ``recognize_intent``.
+        """
+        request = self._prepare_request(
+            user_query=user_query,
+            page_type=page_type,
+            previous_actions=previous_actions,
+            time_on_page=time_on_page,
+            session_history=session_history,
+            **kwargs
+        )
+        if isinstance(request, dict):
+            return request
+
+        # Identical requests already waiting on the LLM share its answer. The
+        # call runs as its own task and every caller awaits it shielded, so a
+        # cancelled caller (even the one that started it) leaves it running.
+        task = self._inflight.get(request.cache_key)
+        if task is None:
+            task = asyncio.get_running_loop().create_task(self._complete_request(request))
+            self._inflight[request.cache_key] = task
+            task.add_done_callback(lambda _task, key=request.cache_key: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _complete_request(self, request: _PendingRequest) -> Dict[str, Any]:
+        """Send a prepared request through the batch scheduler and finish it."""
         try:
-            raw_response = self.llm.generate_sync(
-                prompt=prompt,
-                system_prompt="You are an expert behavioral analyst for digital marketing."
+            raw_response = await self._batch_scheduler.submit(
+                request.prompt, _SYSTEM_PROMPT, request.stable_prefix
             )
+            return self._finish_request(request, raw_response)
+
+        except Exception as e:
+            return self._fallback_response(str(e))
+
+    def _prepare_request(self, **signals: Any) -> Union[Dict[str, Any], _PendingRequest]:
+        """
+        Run the steps before LLM inference.
 
-            # Step 6: Parse LLM response
-            result = self._parse_llm_response(raw_response)
+        Returns a cached result when one applies, otherwise the prompt and
+        bookkeeping needed to finish the request once the LLM has answered.
+        """
+        # Step 1: Build structured context
+        context = self.context_builder.build_context(**signals)
 
-            # Step 7: Calibrate confidence (simplified for hackathon)
-            result = self._calibrate_confidence(result, context)
+        # Step 2: Format context for LLM
+        context_formatted = self.context_builder.format_for_llm(context)
 
-            # Step 8: Add recommended actions from taxonomy
-            result = self._add_marketing_recommendations(result)
+        # Step 3: Check cache
+        cache_key = self._generate_cache_key(context_formatted)
+        if self.enable_caching and self.cache is not None:
+            cached = self.cache.lookup(cache_key)
+            if cached is not None:
+                return cached
+
+        # Step 3b: Reuse the result of a sufficiently similar earlier context,
+        # first by coarse time bucket (a dict lookup), then by embedding
+        bucket_key = None
+        context_embedding = None
+        if self.semantic_cache is not None:
+            bucket_key = self._bucket_key(context)
+            bucketed = self._bucket_cache.lookup(bucket_key)
+            if bucketed is not None:
+                return bucketed
+
+            context_embedding = self.semantic_cache.encode(context_formatted)
+            similar = self.semantic_cache.lookup(context_embedding)
+            if similar is not None:
+                return similar
+
+        # Step 4: Build complete prompt, keeping the request-independent head separate
+        stable_prefix, prompt = self._split_prompt(context_formatted)
+        return _PendingRequest(context, cache_key, bucket_key, context_embedding, stable_prefix, prompt)
+
+    def _finish_request(self, request: _PendingRequest, raw_response: str) -> Dict[str, Any]:
+        """Run the steps after LLM inference and cache the result."""
+        # Step 6: Parse LLM response
+        result = self._parse_llm_response(raw_response)
+
+        # Step 7: Calibrate confidence (simplified for hackathon)
+        result = self._calibrate_confidence(result, request.context)
+
+        # Step 8: Add recommended actions from taxonomy
+        result = self._add_marketing_recommendations(result)
+
+        # Step 9: Cache result
+        if self.enable_caching and self.cache is not None:
+            self.cache.store(request.cache_key, result)
+        if request.bucket_key is not None:
+            self._bucket_cache.store(request.bucket_key, result)
+        if request.embedding is not None:
+            self.semantic_cache.store(request.embedding, result)
 
-            # Step 9: Cache result
-            if self.enable_caching and self.cache is not None:
-                self.cache[cache_key] = result
+        return result
 
-            return result
+    def _compile_prompt_template(self, template: str) -> List[str]:
+        """
+        Pre-render the request-independent parts of the prompt template.
 
-        except Exception as e:
-            # Return error state with fallback
-            return self._fallback_response(str(e))
+        The taxonomy is fixed for the lifetime of the engine, so the intent
+        definitions are baked in once and the template is split around the
+        context placeholders. Each request then only splices in its context.
+        """
+        for placeholder in _CONTEXT_PLACEHOLDERS:
+            template = template.replace(placeholder, _CONTEXT_SLOT)
 
-    def _build_prompt(self, formatted_context: str) -> str:
-        """Build the complete prompt for the LLM."""
-        # Get formatted intent definitions
         intent_definitions = self.taxonomy.format_for_llm()
+        return [
+            segment.replace("{intent_definitions}", intent_definitions)
+            for segment in template.split(_CONTEXT_SLOT)
+        ]
 
-        # Fill in the template
-        prompt = self.prompt_template
-        prompt = prompt.replace("{identity_context}", formatted_context)
-        prompt = prompt.replace("{historical_context}", formatted_context)
-        prompt = prompt.replace("{situational_context}", formatted_context)
-        prompt = prompt.replace("{behavioral_signals}", formatted_context)
-        prompt = prompt.replace("{temporal_signals}", formatted_context)
-        prompt = prompt.replace("{constraint_signals}", formatted_context)
-        prompt = prompt.replace("{intent_definitions}", intent_definitions)
+    def _build_prompt(self, formatted_context: str) -> str:
+        """Build the complete prompt for the LLM."""
+        return formatted_context.join(self._prompt_segments)
 
-        # Simplified: just put full context in one place
-        if "{context}" in prompt:
-            prompt = prompt.replace("{context}", formatted_context)
+    def _split_prompt(self, formatted_context: str) -> Tuple[str, str]:
+        """
+        Split the prompt into its stable prefix and the request-specific rest.
 
-        return prompt
+        The prefix is everything before the first context placeholder (the
+        instructions and the taxonomy), identical for every request, so
+        providers with prompt caching can reuse it across calls.
+        """
+        head, *tail = self._prompt_segments
+        return head, formatted_context.join(["", *tail])
 
     def _parse_llm_response(self, raw_response: str) -> Dict[str, Any]:
         """
@@ -198,27 +493,14 @@ Provide your analysis:
 
         Handles both JSON and natural language responses.
         """
-        # Try to extract JSON from response
-        try:
-            # Look for JSON in the response
-            start_idx = raw_response.find("{")
-            end_idx = raw_response.rfind("}") + 1
-
-            if start_idx != -1 and end_idx > start_idx:
-                json_str = raw_response[start_idx:end_idx]
-                result = json.loads(json_str)
-
-                # Ensure all required fields are present
-                result = self._validate_and_fix_result(result)
-                return result
-            else:
-                # No JSON found, create structured response from text
-                return self._parse_natural_language_response(raw_response)
-
-        except json.JSONDecodeError:
-            # JSON parsing failed, fall back to natural language parsing
+        result = _extract_json_object(raw_response)
+        if result is None:
+            # No JSON found, create structured response from text
             return self._parse_natural_language_response(raw_response)
 
+        # Ensure all required fields are present
+        return self._validate_and_fix_result(result)
+
     def _validate_and_fix_result(self, result: Dict[str, Any]) -> Dict[str, Any]:
         """Ensure result has all required fields."""
         required_fields = {
@@ -243,6 +525,23 @@ Provide your analysis:
 
         return result
 
+    def _compile_intent_matcher(self) -> Tuple[Optional[Pattern[str]], Dict[str, Tuple[int, str]]]:
+        """
+        Compile all intent phrases into one regex for the natural-language fallback.
+
+        The lookahead reports a match at every position, and alternatives are
+        tried in taxonomy order, so taking the lowest-ranked hit picks the
+        same intent as testing each label in turn.
+        """
+        rank: Dict[str, Tuple[int, str]] = {}
+        for index, label in enumerate(self.taxonomy.get_all_intent_labels()):
+            rank.setdefault(label.replace("_", " "), (index, label))
+        if not rank:
+            return None, rank
+
+        alternatives = "|".join(re.escape(phrase) for phrase in rank)
+        return re.compile(f"(?=({alternatives}))"), rank
+
     def _parse_natural_language_response(self, response: str) -> Dict[str, Any]:
         """Parse natural language response when JSON isn't returned."""
         # This is a simplified fallback - in production, use more sophisticated parsing
@@ -253,11 +552,14 @@ Provide your analysis:
 
         response_lower = response.lower()
 
-        # Check for each intent in taxonomy
-        for intent_label in self.taxonomy.get_all_intent_labels():
-            if intent_label.replace("_", " ") in response_lower:
-                intent = intent_label
-                break
+        # Find the earliest taxonomy intent mentioned anywhere, in one scan
+        if self._intent_label_pattern is not None:
+            ranks = [
+                self._intent_label_rank[match.group(1)]
+                for match in self._intent_label_pattern.finditer(response_lower)
+            ]
+            if ranks:
+                intent = min(ranks)[1]
 
         # Try to extract confidence
         if "high confidence" in response_lower or "very confident" in response_lower:
@@ -350,12 +652,51 @@ Provide your analysis:
 
         return result
 
-    def _generate_cache_key(self, context: Dict[str, Any]) -> str:
-        """Generate cache key from context."""
-        # Simplified: use hash of JSON representation
-        # In production, use more sophisticated key generation
-        context_str = json.dumps(context, sort_keys=True)
-        return str(hash(context_str))
+    def _bucket_key(self, context: Dict[str, Any]) -> str:
+        """
+        Cache key for the context with time on page coarsened to a bucket.
+
+        Dwell time differing by a few seconds rarely changes the intent, so
+        contexts that differ only within one bucket share a key.
+        """
+        behavioral = context["behavioral_signals"]
+        seconds = behavioral["time_on_page_seconds"]
+        bucket = _TIME_ON_PAGE_BUCKETS[max(0, bisect.bisect_right(_TIME_ON_PAGE_BUCKETS, seconds) - 1)]
+        coarse = {**context, "behavioral_signals": {**behavioral, "time_on_page_seconds": bucket}}
+        return self._generate_cache_key(self.context_builder.format_for_llm(coarse))
+
+    def _compile_cache_namespace(self) -> Any:
+        """
+        Hasher pre-seeded with everything besides the context that shapes a result.
+
+        Taxonomy, compiled prompt and provider/model go into every key, so a
+        cache shared across workers and deploys never serves a result produced
+        under a different taxonomy, an older prompt or another model.
+        """
+        namespace = hashlib.blake2b(digest_size=16)
+        parts = (
+            self._taxonomy.name,
+            self._taxonomy.version,
+            type(self.llm).__qualname__,
+            getattr(self.llm, "model", ""),
+            *self._prompt_segments,
+        )
+        for part in parts:
+            namespace.update(str(part).encode())
+            namespace.update(b"\x00")
+        return namespace
+
+    def _generate_cache_key(self, formatted_context: str) -> str:
+        """
+        Generate cache key from the LLM-formatted context.
+
+        The formatted text is exactly what the model sees, and unlike the raw
+        context dict it carries no per-request timestamp, so identical
+        requests map to the same key within one taxonomy/prompt/model namespace.
+        """
+        hasher = self._cache_namespace.copy()
+        hasher.update(formatted_context.encode())
+        return hasher.hexdigest()
 
     def _fallback_response(self, error_message: str) -> Dict[str, Any]:
         """Return fallback response when LLM fails."""
@@ -377,14 +718,27 @@ Provide your analysis:
     def clear_cache(self):
         """Clear the intent cache."""
         if self.cache is not None:
-            self.cache = {}
+            self.cache.clear()
+        if self.semantic_cache is not None:
+            self.semantic_cache.clear()
+        self._bucket_cache.clear()
 
     def get_cache_stats(self) -> Dict[str, int]:
         """Get cache statistics."""
         if self.cache is None:
-            return {"enabled": False}
+            stats = {"enabled": False}
+        else:
+            stats = {
+                "enabled": True,
+                "size": len(self.cache),
+                "hits": self.cache.hits,
+                "misses": self.cache.misses
+            }
 
-        return {
-            "enabled": True,
-            "size": len(self.cache)
-        }
+        if self.semantic_cache is not None:
+            stats["bucket_size"] = len(self._bucket_cache)
+            stats["bucket_hits"] = self._bucket_cache.hits
+            stats["semantic_size"] = len(self.semantic_cache)
+            stats["semantic_hits"] = self.semantic_cache.hits
+            stats["semantic_misses"] = self.semantic_cache.misses
+        return stats
@@ -5,38 +5,63 @@ This module provides a clean abstraction over different LLM providers,
 allowing easy switching between Anthropic Claude and OpenAI GPT-4.
 """
 
+import asyncio
+import importlib.util
 import os
-import json
 from typing import Dict, Any, Optional, Literal, List, Sequence
 from abc import ABC, abstractmethod
 
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
 
 try:
-    from anthropic import Anthropic as AnthropicClient
+    from anthropic import Anthropic as AnthropicClient, AsyncAnthropic as AsyncAnthropicClient
     ANTHROPIC_AVAILABLE = True
 except ImportError:  # pragma: no cover - optional dependency
     AnthropicClient = None  # type: ignore[assignment]
+    AsyncAnthropicClient = None  # type: ignore[assignment]
     ANTHROPIC_AVAILABLE = False
 
 try:
-    from openai import OpenAI as OpenAIClient
+    from openai import AsyncOpenAI as AsyncOpenAIClient, OpenAI as OpenAIClient
     OPENAI_AVAILABLE = True
 except ImportError:  # pragma: no cover - optional dependency
+    AsyncOpenAIClient = None  # type: ignore[assignment]
     OpenAIClient = None  # type: ignore[assignment]
     OPENAI_AVAILABLE = False
 
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+    # HTTP/2 multiplexing needs the optional h2 package
+    HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+except ImportError:  # pragma: no cover - optional dependency
+    httpx = None  # type: ignore[assignment]
+    HTTPX_AVAILABLE = False
+    HTTP2_AVAILABLE = False
+
+# Prompt-cache breakpoint for content that repeats verbatim across requests.
+_EPHEMERAL_CACHE = {"type": "ephemeral"}
+
 
 class BaseLLMProvider(ABC):
     """Base class for LLM providers."""
 
     @abstractmethod
-    async def generate(self, prompt: str, system_prompt: str = "") -> str:
-        """Generate a response from the LLM."""
+    async def generate(self, prompt: str, system_prompt: str = "", cacheable_prefix: str = "") -> str:
+        """
+        Generate a response from the LLM.
+
+        ``cacheable_prefix`` is a leading part of the user message that is
+        identical across calls. Providers with prompt caching send it as a
+        cached block; the others simply prepend it to ``prompt``. Subclasses
+        may omit the parameter, in which case the engine prepends it for them.
+        """
         pass
 
     @abstractmethod
-    def generate_sync(self, prompt: str, system_prompt: str = "") -> str:
+    def generate_sync(self, prompt: str, system_prompt: str = "", cacheable_prefix: str = "") -> str:
         """Synchronous version of generate."""
         pass
 
@@ -68,45 +93,73 @@ class AnthropicProvider(BaseLLMProvider):
             raise ValueError("Anthropic API key not provided")
 
         self.client = AnthropicClient(api_key=self.api_key)
+        self.async_client = AsyncAnthropicClient(api_key=self.api_key)
         self.model = model or os.getenv("ANTHROPIC_MODEL", "claude-sonnet-4-20250514")
         self.max_tokens = max_tokens
         self.temperature = temperature
 
-    def generate_sync(self, prompt: str, system_prompt: str = "") -> str:
-        """Generate response synchronously."""
-        try:
-            message = self.client.messages.create(
-                model=self.model,
-                max_tokens=self.max_tokens,
-                temperature=self.temperature,
-                system=system_prompt if system_prompt else "You are a helpful AI assistant.",
-                messages=[
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ]
-            )
+    def _request(self, prompt: str, system_prompt: str, cacheable_prefix: str) -> Dict[str, Any]:
+        """
+        Build the Messages API arguments.
+
+        The system prompt and ``cacheable_prefix`` are marked with an
+        ephemeral ``cache_control`` breakpoint, so repeated calls sharing
+        them are billed and prefilled from Anthropic's prompt cache.
+        """
+        content: List[Dict[str, Any]] = []
+        if cacheable_prefix:
+            content.append({"type": "text", "text": cacheable_prefix, "cache_control": _EPHEMERAL_CACHE})
+        content.append({"type": "text", "text": prompt})
+
+        return {
+            "model": self.model,
+            "max_tokens": self.max_tokens,
+            "temperature": self.temperature,
+            "system": [
+                {
+                    "type": "text",
+                    "text": system_prompt if system_prompt else "You are a helpful AI assistant.",
+                    "cache_control": _EPHEMERAL_CACHE,
+                }
+            ],
+            "messages": [
+                {
+                    "role": "user",
+                    "content": content
+                }
+            ],
+        }
 
-            content_blocks: Sequence[Any] = getattr(message, "content", [])
-            if not content_blocks:
-                raise RuntimeError("Anthropic API error: empty content")
+    @staticmethod
+    def _response_text(message: Any) -> str:
+        content_blocks: Sequence[Any] = getattr(message, "content", [])
+        if not content_blocks:
+            raise RuntimeError("Anthropic API error: empty content")
+
+        first_block = content_blocks[0]
+        text = getattr(first_block, "text", None)
+        if text is None:
+            raise RuntimeError("Anthropic API error: no text in content block")
 
-            first_block = content_blocks[0]
-            text = getattr(first_block, "text", None)
-            if text is None:
-                raise RuntimeError("Anthropic API error: no text in content block")
+        return str(text)
 
-            return str(text)
+    def generate_sync(self, prompt: str, system_prompt: str = "", cacheable_prefix: str = "") -> str:
+        """Generate response synchronously."""
+        try:
+            message = self.client.messages.create(**self._request(prompt, system_prompt, cacheable_prefix))
+            return self._response_text(message)
 
         except Exception as e:
             raise RuntimeError(f"Anthropic API error: {str(e)}")
 
-    async def generate(self, prompt: str, system_prompt: str = "") -> str:
-        """Async version (currently wraps sync)."""
-        # For now, use sync version
-        # TODO: Use async client when available
-        return self.generate_sync(prompt, system_prompt)
+    async def generate(self, prompt: str, system_prompt: str = "", cacheable_prefix: str = "") -> str:
+        """Generate response on the async client, without blocking the event loop."""
+        try:
+            message = await self.async_client.messages.create(**self._request(prompt, system_prompt, cacheable_prefix))
+            return self._response_text(message)
+
+        except Exception as e:
+            raise RuntimeError(f"Anthropic API error: {str(e)}")
 
 
 class OpenAIProvider(BaseLLMProvider):
@@ -136,43 +189,72 @@ class OpenAIProvider(BaseLLMProvider):
             raise ValueError("OpenAI API key not provided")
 
         self.client = OpenAIClient(api_key=self.api_key)
+        self.async_client = AsyncOpenAIClient(api_key=self.api_key)
         self.model = model or os.getenv("OPENAI_MODEL", "gpt-4-turbo-preview")
         self.max_tokens = max_tokens
         self.temperature = temperature
 
-    def generate_sync(self, prompt: str, system_prompt: str = "") -> str:
+    def _messages(self, prompt: str, system_prompt: str) -> List[Dict[str, str]]:
+        return [
+            {
+                "role": "system",
+                "content": system_prompt if system_prompt else "You are a helpful AI assistant."
+            },
+            {
+                "role": "user",
+                "content": prompt
+            }
+        ]
+
+    @staticmethod
+    def _response_text(response: Any) -> str:
+        message = response.choices[0].message
+        content = getattr(message, "content", None)
+        if content is None:
+            raise RuntimeError("OpenAI API error: empty response content")
+        return str(content)
+
+    def generate_sync(self, prompt: str, system_prompt: str = "", cacheable_prefix: str = "") -> str:
         """Generate response synchronously."""
         try:
             response = self.client.chat.completions.create(
                 model=self.model,
                 max_tokens=self.max_tokens,
                 temperature=self.temperature,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": system_prompt if system_prompt else "You are a helpful AI assistant."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ]
+                messages=self._messages(cacheable_prefix + prompt, system_prompt)
             )
+            return self._response_text(response)
 
-            message = response.choices[0].message
-            content = getattr(message, "content", None)
-            if content is None:
-                raise RuntimeError("OpenAI API error: empty response content")
-            return str(content)
+        except Exception as e:
+            raise RuntimeError(f"OpenAI API error: {str(e)}")
+
+    async def generate(self, prompt: str, system_prompt: str = "", cacheable_prefix: str = "") -> str:
+        """Generate response on the async client, without blocking the event loop."""
+        try:
+            response = await self.async_client.chat.completions.create(
+                model=self.model,
+                max_tokens=self.max_tokens,
+                temperature=self.temperature,
+                messages=self._messages(cacheable_prefix + prompt, system_prompt)
+            )
+            return self._response_text(response)
 
         except Exception as e:
             raise RuntimeError(f"OpenAI API error: {str(e)}")
 
-    async def generate(self, prompt: str, system_prompt: str = "") -> str:
-        """Async version (currently wraps sync)."""
-        # For now, use sync version
-        # TODO: Use async client when available
-        return self.generate_sync(prompt, system_prompt)
+
+async def _aclose_on_loop_shutdown(client: "httpx.AsyncClient"):
+    """
+    Async generator left suspended for the lifetime of ``client``.
+
+    Event loops close every pending async generator in ``shutdown_asyncgens()``
+    (``asyncio.run`` does this before closing the loop), which closes the
+    client while its connections' loop is still alive.
+    """
+    try:
+        yield
+    finally:
+        await client.aclose()
 
 
 class OpenRouterProvider(BaseLLMProvider):
@@ -200,8 +282,24 @@ class OpenRouterProvider(BaseLLMProvider):
         self.base_url = base_url.rstrip("/")
         self.referer = referer or os.getenv("OPENROUTER_SITE_URL")
         self.site_title = site_title or os.getenv("OPENROUTER_SITE_NAME")
-
-    def _headers(self) -> Dict[str, str]:
+        self._url = f"{self.base_url}/chat/completions"
+        self._headers = self._build_headers()
+        # Static request fields are encoded once; only the messages vary per call
+        self._payload_prefix = orjson.dumps(
+            {"model": self.model, "temperature": self.temperature, "max_tokens": self.max_tokens}
+        )[:-1] + b',"messages":'
+
+        # Keep-alive session so calls reuse TCP/TLS connections
+        self._session = requests.Session()
+        self._session.headers.update(self._headers)
+        self._session.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=64))
+
+        # Pooled async HTTP client, created on first use inside an event loop
+        self._async_http: Optional["httpx.AsyncClient"] = None
+        self._async_http_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._async_http_closer: Optional[Any] = None
+
+    def _build_headers(self) -> Dict[str, str]:
         headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json",
@@ -212,23 +310,16 @@ class OpenRouterProvider(BaseLLMProvider):
             headers["X-Title"] = self.site_title
         return headers
 
-    def _build_payload(self, prompt: str, system_prompt: str) -> Dict[str, Any]:
-        messages: List[Dict[str, str]] = []  # type: ignore[name-defined]
+    def _build_payload(self, prompt: str, system_prompt: str) -> bytes:
+        messages: List[Dict[str, str]] = []
         if system_prompt:
             messages.append({"role": "system", "content": system_prompt})
         messages.append({"role": "user", "content": prompt})
-        return {
-            "model": self.model,
-            "messages": messages,
-            "temperature": self.temperature,
-            "max_tokens": self.max_tokens,
-        }
-
-    def generate_sync(self, prompt: str, system_prompt: str = "") -> str:
-        payload = self._build_payload(prompt, system_prompt)
-        url = f"{self.base_url}/chat/completions"
+        return self._payload_prefix + orjson.dumps(messages) + b"}"
 
-        response = requests.post(url, headers=self._headers(), data=json.dumps(payload), timeout=60)
+    @staticmethod
+    def _response_text(response: Any) -> str:
+        """Extract the completion from a ``requests`` or ``httpx`` response."""
         if response.status_code != 200:
             try:
                 error_payload = response.json()
@@ -243,8 +334,42 @@ class OpenRouterProvider(BaseLLMProvider):
         except (KeyError, IndexError) as exc:  # noqa: BLE001
             raise RuntimeError(f"Unexpected OpenRouter response: {data}") from exc
 
-    async def generate(self, prompt: str, system_prompt: str = "") -> str:
-        return self.generate_sync(prompt, system_prompt)
+    def generate_sync(self, prompt: str, system_prompt: str = "", cacheable_prefix: str = "") -> str:
+        payload = self._build_payload(cacheable_prefix + prompt, system_prompt)
+        response = self._session.post(self._url, data=payload, timeout=60)
+        return self._response_text(response)
+
+    async def _async_client(self) -> "httpx.AsyncClient":
+        # Pooled connections belong to the loop that opened them
+        loop = asyncio.get_running_loop()
+        if self._async_http is None or self._async_http_loop is not loop:
+            await self.aclose()
+            client = httpx.AsyncClient(timeout=60, http2=HTTP2_AVAILABLE, headers=self._headers)
+            closer = _aclose_on_loop_shutdown(client)
+            await closer.__anext__()
+            self._async_http, self._async_http_loop, self._async_http_closer = client, loop, closer
+        return self._async_http
+
+    async def aclose(self) -> None:
+        """Close the pooled async HTTP client; the next async call opens a new one."""
+        closer, loop = self._async_http_closer, self._async_http_loop
+        self._async_http = self._async_http_loop = self._async_http_closer = None
+        if closer is None or loop.is_closed():
+            return  # already closed by its loop's shutdown
+        if loop is asyncio.get_running_loop():
+            await closer.aclose()
+        elif loop.is_running():
+            # Connections can only be closed on their own loop
+            asyncio.run_coroutine_threadsafe(closer.aclose(), loop)
+
+    async def generate(self, prompt: str, system_prompt: str = "", cacheable_prefix: str = "") -> str:
+        if not HTTPX_AVAILABLE:
+            return await asyncio.to_thread(self.generate_sync, prompt, system_prompt, cacheable_prefix)
+
+        payload = self._build_payload(cacheable_prefix + prompt, system_prompt)
+        client = await self._async_client()
+        response = await client.post(self._url, content=payload)
+        return self._response_text(response)
 
 
 class LLMProviderFactory:
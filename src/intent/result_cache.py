@@ -0,0 +1,168 @@
+"""
+Bounded exact-match cache for intent recognition results.
+
+Long-running servers (Gradio, MCP) see an open-ended stream of contexts, so
+results are kept in a fixed-capacity LRU and each entry expires after a TTL:
+memory stays bounded and stale intents age out as taxonomies and prompts evolve.
+Deployments with several workers can share results through Redis instead.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Protocol, Tuple
+
+import orjson
+
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:  # pragma: no cover - optional dependency
+    redis = None  # type: ignore[assignment]
+    REDIS_AVAILABLE = False
+
+
+class CacheBackend(Protocol):
+    """Storage the engine's exact cache needs: keyed lookup, store and clear."""
+
+    hits: int
+    misses: int
+
+    def lookup(self, key: str) -> Optional[Dict[str, Any]]: ...
+
+    def store(self, key: str, result: Dict[str, Any]) -> None: ...
+
+    def clear(self) -> None: ...
+
+    def __len__(self) -> int: ...
+
+
+class ResultCache:
+    """
+    Thread-safe LRU cache of intent results with per-entry expiry.
+
+    Gradio serves requests from worker threads, so every operation takes the
+    same lock; the critical sections are single dict operations.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 10_000,
+        ttl: Optional[float] = 3600.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize the result cache.
+
+        Args:
+            capacity: Maximum number of cached results before LRU eviction
+            ttl: Seconds an entry stays valid (None disables expiry)
+            clock: Monotonic time source, injectable for tests
+        """
+        if capacity < 1:
+            raise ValueError("Result cache capacity must be at least 1.")
+        self.capacity = capacity
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached result for ``key`` unless it is missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, result = entry
+            if expires_at < self._clock():
+                del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def store(self, key: str, result: Dict[str, Any]) -> None:
+        """Cache a result, evicting the least recently used entry when full."""
+        expires_at = self._clock() + self.ttl if self.ttl is not None else float("inf")
+        with self._lock:
+            self._entries[key] = (expires_at, result)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all cached results."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RedisResultCache:
+    """
+    Intent results shared through Redis across workers and restarts.
+
+    Keys are the engine's blake2b digests under a namespace prefix; values are
+    orjson-encoded and expire server-side after the TTL.
+    """
+
+    def __init__(
+        self,
+        url: Optional[str] = None,
+        ttl: Optional[float] = 3600.0,
+        prefix: str = "intent:",
+        client: Any = None,
+    ):
+        """
+        Initialize the Redis-backed cache.
+
+        Args:
+            url: Redis URL (defaults to the REDIS_URL env var)
+            ttl: Seconds an entry stays valid (None disables expiry)
+            prefix: Namespace prepended to every key
+            client: Preconfigured Redis client (takes precedence over url)
+        """
+        if client is None:
+            if not REDIS_AVAILABLE:
+                raise ImportError("redis package not installed. Run: pip install redis")
+            url = url or os.getenv("REDIS_URL")
+            if not url:
+                raise ValueError("Redis URL not provided")
+            client = redis.Redis.from_url(url)
+
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached result for ``key`` if Redis still holds it."""
+        payload = self.client.get(self.prefix + key)
+        if payload is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return orjson.loads(payload)
+
+    def store(self, key: str, result: Dict[str, Any]) -> None:
+        """Cache a result; Redis evicts it once the TTL passes."""
+        ttl = int(self.ttl) if self.ttl is not None else None
+        self.client.set(self.prefix + key, orjson.dumps(result), ex=ttl)
+
+    def clear(self) -> None:
+        """Delete every key under this cache's prefix."""
+        keys = list(self.client.scan_iter(match=self.prefix + "*"))
+        if keys:
+            self.client.delete(*keys)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self.client.scan_iter(match=self.prefix + "*"))
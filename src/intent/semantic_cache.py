@@ -0,0 +1,121 @@
+"""
+Semantic cache for intent recognition results.
+
+Behavioral contexts cluster tightly: two visitors on the same page with the
+same actions and a few seconds' difference in dwell time should get the same
+intent. Rather than keying on the exact context, this cache embeds the
+formatted context and reuses a stored result when a previous context is
+close enough in cosine similarity, skipping the LLM call entirely.
+"""
+
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from .embedder import get_sentence_encoder
+
+
+Encoder = Callable[[str], np.ndarray]
+
+
+class SemanticCache:
+    """
+    Fixed-capacity LRU cache of intent results, looked up by embedding similarity.
+
+    Embeddings are stored as rows of one preallocated, L2-normalized float32
+    matrix, so a lookup is a single matrix-vector product followed by argmax.
+    Gradio serves requests from worker threads, so lookups and stores take the
+    same lock; encoding happens outside it.
+    """
+
+    def __init__(
+        self,
+        encoder: Optional[Encoder] = None,
+        *,
+        threshold: float = 0.87,
+        capacity: int = 1024,
+        model_name: str = "all-MiniLM-L6-v2",
+    ):
+        """
+        Initialize the semantic cache.
+
+        Args:
+            encoder: Callable mapping text to a 1-D embedding (defaults to the
+                     shared sentence-transformers model, loaded on first use)
+            threshold: Minimum cosine similarity for a cached result to be reused
+            capacity: Maximum number of cached results before LRU eviction
+            model_name: Sentence transformer model used when no encoder is given
+        """
+        if capacity < 1:
+            raise ValueError("Semantic cache capacity must be at least 1.")
+        self.threshold = threshold
+        self.capacity = capacity
+        self.model_name = model_name
+        self._encoder = encoder
+
+        self._embeddings: Optional[np.ndarray] = None  # (capacity, dim), allocated on first store
+        self._results: List[Optional[Dict[str, Any]]] = [None] * capacity
+        self._last_used = np.zeros(capacity, dtype=np.int64)
+        self._clock = 0
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def encode(self, text: str) -> np.ndarray:
+        """Embed text as an L2-normalized float32 vector."""
+        if self._encoder is None:
+            self._encoder = get_sentence_encoder(self.model_name).encode
+
+        embedding = np.asarray(self._encoder(text), dtype=np.float32).ravel()
+        norm = float(np.linalg.norm(embedding))
+        return embedding / norm if norm > 0 else embedding
+
+    def lookup(self, embedding: np.ndarray) -> Optional[Dict[str, Any]]:
+        """Return the cached result most similar to ``embedding`` if it clears the threshold."""
+        with self._lock:
+            if self._size == 0:
+                self.misses += 1
+                return None
+
+            scores = self._embeddings[: self._size] @ embedding
+            best = int(np.argmax(scores))
+            if scores[best] < self.threshold:
+                self.misses += 1
+                return None
+
+            self._touch(best)
+            self.hits += 1
+            return self._results[best]
+
+    def store(self, embedding: np.ndarray, result: Dict[str, Any]) -> None:
+        """Cache a result under its context embedding, evicting the least recently used entry when full."""
+        with self._lock:
+            if self._embeddings is None:
+                self._embeddings = np.zeros((self.capacity, embedding.shape[0]), dtype=np.float32)
+
+            if self._size < self.capacity:
+                slot = self._size
+                self._size += 1
+            else:
+                slot = int(np.argmin(self._last_used))
+
+            self._embeddings[slot] = embedding
+            self._results[slot] = result
+            self._touch(slot)
+
+    def clear(self) -> None:
+        """Drop all cached results (the embedding buffer is kept for reuse)."""
+        with self._lock:
+            self._results = [None] * self.capacity
+            self._last_used.fill(0)
+            self._clock = 0
+            self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _touch(self, slot: int) -> None:
+        self._clock += 1
+        self._last_used[slot] = self._clock
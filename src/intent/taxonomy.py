@@ -5,10 +5,18 @@ This module handles loading intent taxonomies, which define the possible intents
 and their characteristics for different domains (ecommerce, B2B SaaS, etc.)
 """
 
+import os
+import orjson
 import yaml
+from functools import lru_cache
 from typing import Dict, Any, List, Optional
 from pathlib import Path
 
+try:  # libyaml-backed loader when PyYAML was built with it
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:  # pragma: no cover - pure-Python fallback
+    from yaml import SafeLoader as _YamlLoader  # type: ignore
+
 
 class IntentTaxonomy:
     """Manages intent taxonomy definitions."""
@@ -29,20 +37,33 @@ class IntentTaxonomy:
         self.transitions = taxonomy_data.get("transitions", {})
         self.recommended_actions = taxonomy_data.get("recommended_actions", {})
 
+        # Lookup indices, built once
+        self._stage_index: Dict[str, List[str]] = {}
+        for label, definition in self.intents.items():
+            self._stage_index.setdefault(definition.get("stage"), []).append(label)
+
+        # Earlier groups take precedence, so they are merged last
+        self._modifier_index: Dict[str, float] = {}
+        for group in ("temporal_factors", "weak_signals", "strong_signals"):
+            self._modifier_index.update(self.confidence_modifiers.get(group) or {})
+
     @classmethod
     def from_file(cls, filepath: str) -> "IntentTaxonomy":
         """
         Load taxonomy from YAML file.
 
+        Loads are cached by resolved path and modification time, so repeated
+        calls for an unchanged file return the same shared instance; treat it
+        as read-only.
+
         Args:
             filepath: Path to YAML file
 
         Returns:
             IntentTaxonomy instance
         """
-        with open(filepath, "r") as f:
-            data = yaml.safe_load(f)
-        return cls(data)
+        mtime_ns = os.stat(filepath).st_mtime_ns
+        return _load_taxonomy(cls, os.path.abspath(filepath), mtime_ns)
 
     @classmethod
     def from_domain(cls, domain: str, config_dir: str = "config/intent_taxonomies") -> "IntentTaxonomy":
@@ -77,11 +98,7 @@ class IntentTaxonomy:
         Returns:
             List of intent labels for that stage
         """
-        return [
-            label
-            for label, definition in self.intents.items()
-            if definition.get("stage") == stage
-        ]
+        return list(self._stage_index.get(stage, ()))
 
     def get_confidence_modifier(self, signal_name: str) -> float:
         """
@@ -93,19 +110,7 @@ class IntentTaxonomy:
         Returns:
             Modifier value (positive or negative)
         """
-        # Check in strong signals
-        if signal_name in self.confidence_modifiers.get("strong_signals", {}):
-            return self.confidence_modifiers["strong_signals"][signal_name]
-
-        # Check in weak signals
-        if signal_name in self.confidence_modifiers.get("weak_signals", {}):
-            return self.confidence_modifiers["weak_signals"][signal_name]
-
-        # Check in temporal factors
-        if signal_name in self.confidence_modifiers.get("temporal_factors", {}):
-            return self.confidence_modifiers["temporal_factors"][signal_name]
-
-        return 0.0  # No modifier
+        return self._modifier_index.get(signal_name, 0.0)  # 0.0: no modifier
 
     def get_recommended_actions(self, intent_label: str) -> List[str]:
         """Get recommended marketing actions for an intent."""
@@ -174,3 +179,42 @@ class IntentTaxonomy:
 
     def __repr__(self) -> str:
         return f"IntentTaxonomy(name='{self.name}', domain='{self.domain}', intents={len(self.intents)})"
+
+
+@lru_cache(maxsize=32)
+def _load_taxonomy(cls: type, path: str, mtime_ns: int) -> IntentTaxonomy:
+    return cls(_read_taxonomy_data(path, mtime_ns))
+
+
+def _read_taxonomy_data(path: str, mtime_ns: int) -> Dict[str, Any]:
+    """
+    Parse a taxonomy YAML, going through a ``.json`` sidecar when possible.
+
+    The sidecar is used only when it is newer than the YAML, and written only
+    when the data survives a JSON round trip unchanged (no dates, no
+    non-string keys), so it never changes what the taxonomy contains.
+    """
+    sidecar = path + ".json"
+    try:
+        if os.stat(sidecar).st_mtime_ns > mtime_ns:
+            with open(sidecar, "rb") as f:
+                return orjson.loads(f.read())
+    except (OSError, orjson.JSONDecodeError):
+        pass
+
+    # Binary stream: the YAML reader detects the encoding itself
+    with open(path, "rb") as f:
+        data = yaml.load(f, Loader=_YamlLoader)
+
+    try:
+        encoded = orjson.dumps(data)
+        if orjson.loads(encoded) == data:
+            # Write-then-rename so readers never see a partial sidecar
+            tmp_path = f"{sidecar}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(encoded)
+            os.replace(tmp_path, sidecar)
+    except (TypeError, OSError):
+        pass  # unserializable data or read-only config dir: YAML it is
+
+    return data
@@ -9,14 +9,70 @@ From article: "When you discover that 18% of your traffic follows the pattern 'r
 you can build campaigns specifically for them, optimize bidding, predict behavior."
 """
 
+import asyncio
+import copy
+import hashlib
 import json
+import threading
 import numpy as np
-from typing import List, Dict, Any, Optional
-from collections import Counter
+import orjson
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
+from collections import Counter, OrderedDict
+from functools import lru_cache
 
 from ..intent.llm_provider import BaseLLMProvider, LLMProviderFactory
 
 
+# Intent stage families (from article: awareness → consideration → decision);
+# an intent belongs to a stage when it contains one of the stage's names.
+_RESEARCH_INTENTS = ('browsing_inspiration', 'category_research')
+_COMPARISON_INTENTS = ('compare_options', 'price_discovery', 'evaluate_fit')
+_DECISION_INTENTS = ('ready_to_purchase', 'deal_seeking', 'gift_shopping')
+
+_PERSONA_SYSTEM_PROMPT = "You are an expert marketing strategist specializing in behavioral audience segmentation."
+
+# From the first "{" to the last "}" in an LLM response
+_JSON_OBJECT_RE = re.compile(r'\{.*\}', re.DOTALL)
+
+# Maximum number of generated personas kept for reuse
+PERSONA_CACHE_SIZE = 256
+
+
+def _rounded(value: Any) -> Any:
+    if isinstance(value, float):
+        return round(value, 2)
+    if isinstance(value, dict):
+        return {key: _rounded(item) for key, item in value.items()}
+    return value
+
+
+def _fingerprint(size: int, percentage: float, statistics: Dict[str, Any]) -> str:
+    """
+    Canonical digest of everything the persona prompt is built from.
+
+    Floats are rounded to two decimals, so statistics that only differ in
+    noise below what the prompt displays share a fingerprint. The cluster id
+    is left out: ids are renumbered between clustering runs.
+    """
+    canonical = orjson.dumps(
+        _rounded({'size': size, 'percentage': percentage, 'statistics': statistics}),
+        option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS,
+    )
+    return hashlib.blake2b(canonical, digest_size=16).hexdigest()
+
+
+@lru_cache(maxsize=256)
+def _intent_stages(intent: str) -> Tuple[bool, bool, bool]:
+    """Whether an intent counts toward the research, comparison and decision stages."""
+    return (
+        any(r in intent for r in _RESEARCH_INTENTS),
+        any(c in intent for c in _COMPARISON_INTENTS),
+        any(d in intent for d in _DECISION_INTENTS),
+    )
+
+
 class PatternAnalyzer:
     """
     Analyzes discovered patterns and generates persona descriptions using LLM.
@@ -34,6 +90,10 @@ class PatternAnalyzer:
                          If None, will auto-detect from environment.
         """
         self.llm = llm_provider or LLMProviderFactory.create_from_env()
+
+        # Personas already generated, keyed by statistics fingerprint
+        self._persona_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._persona_cache_lock = threading.Lock()
         print(f"🤖 Pattern Analyzer initialized with {type(self.llm).__name__}")
 
     def analyze_cluster(
@@ -55,6 +115,40 @@ class PatternAnalyzer:
 
         From article: "Step 4: Name and characterize each pattern"
         """
+        result = self._summarize_cluster(cluster_id, user_histories, cluster_size_total)
+
+        # Generate persona using LLM
+        result['persona'] = self._generate_persona_with_llm(
+            cluster_id=cluster_id,
+            size=result['size'],
+            percentage=result['percentage'],
+            statistics=result['statistics']
+        )
+        return result
+
+    async def analyze_cluster_async(
+        self,
+        cluster_id: int,
+        user_histories: List[List[Dict[str, Any]]],
+        cluster_size_total: int
+    ) -> Dict[str, Any]:
+        """Async variant of ``analyze_cluster`` that awaits the provider's async ``generate``."""
+        result = self._summarize_cluster(cluster_id, user_histories, cluster_size_total)
+        result['persona'] = await self._generate_persona_with_llm_async(
+            cluster_id=cluster_id,
+            size=result['size'],
+            percentage=result['percentage'],
+            statistics=result['statistics']
+        )
+        return result
+
+    def _summarize_cluster(
+        self,
+        cluster_id: int,
+        user_histories: List[List[Dict[str, Any]]],
+        cluster_size_total: int
+    ) -> Dict[str, Any]:
+        """Compute everything about a cluster except its LLM persona."""
         print(f"\n🔬 Analyzing Pattern {cluster_id}...")
         print(f"   Users in this pattern: {len(user_histories)}")
 
@@ -67,20 +161,12 @@ class PatternAnalyzer:
         print(f"   Intent distribution: {dict(list(stats['intent_distribution'].items())[:3])}")
         print(f"   Avg journey length: {stats['avg_journey_length']:.1f} sessions")
 
-        # Generate persona using LLM
-        persona = self._generate_persona_with_llm(
-            cluster_id=cluster_id,
-            size=len(user_histories),
-            percentage=percentage,
-            statistics=stats
-        )
-
         return {
             'cluster_id': cluster_id,
             'size': len(user_histories),
             'percentage': percentage,
             'statistics': stats,
-            'persona': persona,
+            'persona': None,
             'user_indices': list(range(len(user_histories)))  # Can be used to map back to original data
         }
 
@@ -93,52 +179,49 @@ class PatternAnalyzer:
 
         Returns rich behavioral data for LLM to analyze.
         """
-        all_intents = []
+        intent_dist: Counter = Counter()
+        channel_dist: Counter = Counter()
+        engagement_dist: Counter = Counter()
+        urgency_levels: Counter = Counter()
+        expertise_levels: Counter = Counter()
         all_confidences = []
-        all_channels = []
-        all_engagement_levels = []
         journey_lengths = []
-        budget_constraints = []
-        time_constraints = []
-        knowledge_gaps = []
-        urgency_levels = []
-        expertise_levels = []
+        budget_count = time_count = knowledge_count = 0
 
         for history in user_histories:
             journey_lengths.append(len(history))
 
             for record in history:
-                all_intents.append(record.get('intent', 'unknown'))
+                intent_dist[record.get('intent', 'unknown')] += 1
                 all_confidences.append(record.get('confidence', 0.5))
-                all_channels.append(record.get('channel', 'unknown'))
-                all_engagement_levels.append(record.get('engagement_level', 'medium'))
-                budget_constraints.append(record.get('has_budget_constraint', False))
-                time_constraints.append(record.get('has_time_constraint', False))
-                knowledge_gaps.append(record.get('has_knowledge_gap', False))
-                urgency_levels.append(record.get('urgency_level', 'medium'))
-                expertise_levels.append(record.get('expertise_level', 'intermediate'))
+                channel_dist[record.get('channel', 'unknown')] += 1
+                engagement_dist[record.get('engagement_level', 'medium')] += 1
+                budget_count += record.get('has_budget_constraint', False)
+                time_count += record.get('has_time_constraint', False)
+                knowledge_count += record.get('has_knowledge_gap', False)
+                urgency_levels[record.get('urgency_level', 'medium')] += 1
+                expertise_levels[record.get('expertise_level', 'intermediate')] += 1
+
+        total_sessions = len(all_confidences)
 
         # Calculate distributions
-        intent_dist = Counter(all_intents)
         total_intents = sum(intent_dist.values())
         intent_percentages = {k: (v / total_intents * 100) for k, v in intent_dist.most_common(10)}
 
-        channel_dist = Counter(all_channels)
         total_channels = sum(channel_dist.values())
         channel_percentages = {k: (v / total_channels * 100) for k, v in channel_dist.items()}
 
-        engagement_dist = Counter(all_engagement_levels)
         total_engagement = sum(engagement_dist.values())
         engagement_percentages = {k: (v / total_engagement * 100) for k, v in engagement_dist.items()}
 
-        # Intent stage analysis (from article: awareness → consideration → decision)
-        research_intents = ['browsing_inspiration', 'category_research']
-        comparison_intents = ['compare_options', 'price_discovery', 'evaluate_fit']
-        decision_intents = ['ready_to_purchase', 'deal_seeking', 'gift_shopping']
-
-        research_count = sum(1 for i in all_intents if any(r in i for r in research_intents))
-        comparison_count = sum(1 for i in all_intents if any(c in i for c in comparison_intents))
-        decision_count = sum(1 for i in all_intents if any(d in i for d in decision_intents))
+        # Intent stage analysis (from article: awareness → consideration → decision),
+        # classified once per distinct intent and weighted by its count
+        research_count = comparison_count = decision_count = 0
+        for intent, count in intent_dist.items():
+            in_research, in_comparison, in_decision = _intent_stages(intent)
+            research_count += count * in_research
+            comparison_count += count * in_comparison
+            decision_count += count * in_decision
 
         total_stage_intents = research_count + comparison_count + decision_count
         if total_stage_intents > 0:
@@ -159,12 +242,12 @@ class PatternAnalyzer:
             'avg_journey_length': float(np.mean(journey_lengths)) if journey_lengths else 0,
             'min_journey_length': int(np.min(journey_lengths)) if journey_lengths else 0,
             'max_journey_length': int(np.max(journey_lengths)) if journey_lengths else 0,
-            'budget_conscious_ratio': sum(budget_constraints) / len(budget_constraints) if budget_constraints else 0,
-            'time_sensitive_ratio': sum(time_constraints) / len(time_constraints) if time_constraints else 0,
-            'knowledge_gap_ratio': sum(knowledge_gaps) / len(knowledge_gaps) if knowledge_gaps else 0,
-            'urgency_distribution': Counter(urgency_levels),
-            'expertise_distribution': Counter(expertise_levels),
-            'total_sessions': len(all_intents)
+            'budget_conscious_ratio': budget_count / total_sessions if total_sessions else 0,
+            'time_sensitive_ratio': time_count / total_sessions if total_sessions else 0,
+            'knowledge_gap_ratio': knowledge_count / total_sessions if total_sessions else 0,
+            'urgency_distribution': urgency_levels,
+            'expertise_distribution': expertise_levels,
+            'total_sessions': total_sessions
         }
 
     def _generate_persona_with_llm(
@@ -180,6 +263,11 @@ class PatternAnalyzer:
         From article: "Give it the cluster statistics and ask: What defines this group?
         What should we call them? How should we market to them?"
         """
+        fingerprint = _fingerprint(size, percentage, statistics)
+        cached = self._cached_persona(fingerprint)
+        if cached is not None:
+            return cached
+
         # Build the prompt
         prompt = self._build_persona_prompt(cluster_id, size, percentage, statistics)
 
@@ -187,24 +275,61 @@ class PatternAnalyzer:
             print(f"   🤖 Generating persona with LLM...")
 
             # Call LLM
-            response = self.llm.generate_sync(
-                prompt=prompt,
-                system_prompt="You are an expert marketing strategist specializing in behavioral audience segmentation."
-            )
+            response = self.llm.generate_sync(prompt=prompt, system_prompt=_PERSONA_SYSTEM_PROMPT)
+            return self._persona_from_response(response, fingerprint)
 
-            # Parse response
-            persona = self._parse_persona_response(response)
-            if persona is None:
-                raise ValueError("Persona parsing returned None")
+        except Exception as e:
+            print(f"   ⚠️  Persona generation fallback triggered: {e}")
+            return self._create_fallback_persona(cluster_id, size, percentage, statistics)
 
-            print(f"   ✅ Persona generated: \"{persona.get('persona_name', 'Unknown')}\"")
+    async def _generate_persona_with_llm_async(
+        self,
+        cluster_id: int,
+        size: int,
+        percentage: float,
+        statistics: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Async variant of ``_generate_persona_with_llm``."""
+        fingerprint = _fingerprint(size, percentage, statistics)
+        cached = self._cached_persona(fingerprint)
+        if cached is not None:
+            return cached
+
+        prompt = self._build_persona_prompt(cluster_id, size, percentage, statistics)
 
-            return persona
+        try:
+            response = await self.llm.generate(prompt=prompt, system_prompt=_PERSONA_SYSTEM_PROMPT)
+            return self._persona_from_response(response, fingerprint)
 
         except Exception as e:
             print(f"   ⚠️  Persona generation fallback triggered: {e}")
             return self._create_fallback_persona(cluster_id, size, percentage, statistics)
 
+    def _persona_from_response(self, response: str, fingerprint: str) -> Dict[str, Any]:
+        persona = self._parse_persona_response(response)
+        if persona is None:
+            raise ValueError("Persona parsing returned None")
+
+        print(f"   ✅ Persona generated: \"{persona.get('persona_name', 'Unknown')}\"")
+
+        # Only LLM personas are cached; fallbacks should be retried next run
+        with self._persona_cache_lock:
+            self._persona_cache[fingerprint] = copy.deepcopy(persona)
+            if len(self._persona_cache) > PERSONA_CACHE_SIZE:
+                self._persona_cache.popitem(last=False)
+        return persona
+
+    def _cached_persona(self, fingerprint: str) -> Optional[Dict[str, Any]]:
+        with self._persona_cache_lock:
+            persona = self._persona_cache.get(fingerprint)
+            if persona is None:
+                return None
+            self._persona_cache.move_to_end(fingerprint)
+
+        print("   ♻️  Reusing persona for identical cluster statistics")
+        # Copy so callers can edit their persona without touching the cache
+        return copy.deepcopy(persona)
+
     def _build_persona_prompt(
         self,
         cluster_id: int,
@@ -319,31 +444,11 @@ Generate the persona now (JSON only, no markdown formatting):"""
 
         Handles both clean JSON and markdown-wrapped JSON.
         """
-        # Try to extract JSON from response
-        response_clean = response.strip()
+        # Outermost braces, whether or not the JSON is wrapped in a code fence
+        match = _JSON_OBJECT_RE.search(response)
 
-        # Remove markdown code blocks if present
-        if response_clean.startswith('```'):
-            # Find the content between ``` markers
-            lines = response_clean.split('\n')
-            json_lines = []
-            in_code_block = False
-
-            for line in lines:
-                if line.strip().startswith('```'):
-                    in_code_block = not in_code_block
-                    continue
-                if in_code_block or (line.strip().startswith('{') or line.strip().startswith('"')):
-                    json_lines.append(line)
-
-            response_clean = '\n'.join(json_lines)
-
-        # Find JSON object
-        start_idx = response_clean.find('{')
-        end_idx = response_clean.rfind('}') + 1
-
-        if start_idx != -1 and end_idx > start_idx:
-            json_str = response_clean[start_idx:end_idx]
+        if match:
+            json_str = match.group(0)
 
             try:
                 persona = json.loads(json_str)
@@ -431,47 +536,98 @@ Generate the persona now (JSON only, no markdown formatting):"""
     def analyze_all_clusters(
         self,
         cluster_labels: np.ndarray,
-        user_histories: List[List[Dict[str, Any]]]
+        user_histories: List[List[Dict[str, Any]]],
+        max_concurrent: int = 8
     ) -> List[Dict[str, Any]]:
         """
         Analyze all discovered clusters and generate personas.
 
+        Persona LLM calls are I/O-bound, so clusters are analyzed on a small
+        thread pool rather than one after another.
+
         Args:
             cluster_labels: Array of cluster assignments from PatternClusterer
             user_histories: Original user histories
+            max_concurrent: Maximum number of persona LLM calls in flight
 
         Returns:
             List of persona dictionaries
         """
+        clusters, total_users = self._group_clusters(cluster_labels, user_histories)
+        if not clusters:
+            return []
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_concurrent, len(clusters)))) as pool:
+            personas = list(pool.map(
+                lambda cluster: self.analyze_cluster(
+                    cluster_id=cluster[0],
+                    user_histories=cluster[1],
+                    cluster_size_total=total_users
+                ),
+                clusters
+            ))
+
+        print(f"\n✅ Generated {len(personas)} audience personas")
+
+        return personas
+
+    async def analyze_all_clusters_async(
+        self,
+        cluster_labels: np.ndarray,
+        user_histories: List[List[Dict[str, Any]]],
+        max_concurrent: int = 8
+    ) -> List[Dict[str, Any]]:
+        """
+        Async variant of ``analyze_all_clusters`` for callers already in an event loop.
+
+        All persona requests are issued through the provider's async
+        ``generate``, at most ``max_concurrent`` at a time.
+        """
+        clusters, total_users = self._group_clusters(cluster_labels, user_histories)
+        if not clusters:
+            return []
+
+        semaphore = asyncio.Semaphore(max_concurrent)
+
+        async def analyze(cluster_id: int, cluster_histories: List[List[Dict[str, Any]]]) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.analyze_cluster_async(
+                    cluster_id=cluster_id,
+                    user_histories=cluster_histories,
+                    cluster_size_total=total_users
+                )
+
+        personas = list(await asyncio.gather(*(analyze(*cluster) for cluster in clusters)))
+
+        print(f"\n✅ Generated {len(personas)} audience personas")
+
+        return personas
+
+    def _group_clusters(
+        self,
+        cluster_labels: np.ndarray,
+        user_histories: List[List[Dict[str, Any]]]
+    ) -> Tuple[List[Tuple[int, List[List[Dict[str, Any]]]]], int]:
+        """Split histories by cluster label (noise excluded), in label order, with the clustered user total."""
         unique_labels = set(cluster_labels)
         unique_labels.discard(-1)  # Remove noise label
 
-        personas = []
         total_users = len([l for l in cluster_labels if l != -1])  # Exclude noise from total
 
         if total_users == 0 or not unique_labels:
             print("\n⚠️  No valid clusters to analyze (all points classified as noise)")
-            return personas
+            return [], total_users
 
         print(f"\n📊 Analyzing {len(unique_labels)} discovered patterns...")
 
+        clusters = []
         for label in sorted(unique_labels):
             # Get user histories for this cluster
             cluster_mask = cluster_labels == label
             cluster_histories = [user_histories[i] for i, mask in enumerate(cluster_mask) if mask]
+            clusters.append((int(label), cluster_histories))
 
-            # Analyze cluster
-            persona = self.analyze_cluster(
-                cluster_id=int(label),
-                user_histories=cluster_histories,
-                cluster_size_total=total_users
-            )
-
-            personas.append(persona)
-
-        print(f"\n✅ Generated {len(personas)} audience personas")
-
-        return personas
+        return clusters, total_users
 
     def export_personas_for_activation(
         self,
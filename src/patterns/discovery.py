@@ -169,8 +169,12 @@ def run_pattern_discovery(
     summary_rows: List[Dict[str, Any]] = []
     personas: List[Dict[str, Any]] = []
 
-    for cluster_id in sorted(df["cluster"].unique()):
-        subset = df[df["cluster"] == cluster_id]
+    # One partitioning pass + vectorized means instead of a boolean mask per cluster.
+    grouped = df.groupby("cluster", sort=True)
+    cluster_means = grouped[["time_on_page", "actions_count", "budget_flag", "time_flag"]].mean()
+
+    for cluster_id, subset in grouped:
+        means = cluster_means.loc[cluster_id]
         dominant_intent = "unknown"
         if "expected_intent" in subset and not subset["expected_intent"].dropna().empty:
             mode_values = subset["expected_intent"].mode()
@@ -188,8 +192,8 @@ def run_pattern_discovery(
             {
                 "cluster_id": int(cluster_id),
                 "sessions": len(subset),
-                "avg_time_on_page": float(subset["time_on_page"].mean()),
-                "avg_actions": float(subset["actions_count"].mean()),
+                "avg_time_on_page": float(means["time_on_page"]),
+                "avg_actions": float(means["actions_count"]),
                 "engagement_mode": engagement_mode,
                 "dominant_intent": dominant_intent,
             }
@@ -202,8 +206,8 @@ def run_pattern_discovery(
                 "sessions": len(subset),
                 "key_signals": {
                     "engagement": engagement_mode,
-                    "budget_focus": float(subset["budget_flag"].mean()),
-                    "urgency": float(subset["time_flag"].mean()),
+                    "budget_focus": float(means["budget_flag"]),
+                    "urgency": float(means["time_flag"]),
                 },
                 "recommended_actions": taxonomy.get_recommended_actions(dominant_intent)
                 if taxonomy
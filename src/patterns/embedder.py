@@ -13,10 +13,44 @@ From article: "Represent each user as a behavioral signature:
 """
 
 import numpy as np
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Sequence, Union
 from sentence_transformers import SentenceTransformer
 from datetime import datetime
 
+from ..intent.embedder import get_sentence_encoder
+
+
+# Structured dtype for session records; histories may be passed either as a
+# list of dicts or as a NumPy array of this dtype (one row per session).
+SESSION_DTYPE = np.dtype([
+    ('intent', '<U24'),
+    ('confidence', 'f4'),
+    ('timestamp', '<U25'),
+    ('channel', '<U12'),
+    ('engagement_level', '<U10'),
+    ('has_budget_constraint', '?'),
+    ('has_time_constraint', '?'),
+    ('has_knowledge_gap', '?'),
+    ('urgency_level', '<U8'),
+    ('expertise_level', '<U12'),
+])
+
+# Value assumed for a field missing from a session record
+SESSION_FIELD_DEFAULTS: Dict[str, Any] = {
+    'intent': 'unknown',
+    'confidence': 0.5,
+    'timestamp': '',
+    'channel': 'direct',
+    'engagement_level': 'medium',
+    'has_budget_constraint': False,
+    'has_time_constraint': False,
+    'has_knowledge_gap': False,
+    'urgency_level': 'low',
+    'expertise_level': 'intermediate',
+}
+
+UserHistory = Union[Sequence[Dict[str, Any]], np.ndarray]
+
 
 class BehavioralEmbedder:
     """
@@ -39,11 +73,11 @@ class BehavioralEmbedder:
                        For production, consider 'all-mpnet-base-v2' (768 dimensions)
         """
         print(f"🔧 Loading sentence transformer model: {model_name}")
-        self.text_encoder = SentenceTransformer(model_name)
+        self.text_encoder = get_sentence_encoder(model_name, loader=SentenceTransformer)
         self.embedding_dim = self.text_encoder.get_sentence_embedding_dimension()
         print(f"✅ Model loaded. Embedding dimension: {self.embedding_dim}")
 
-    def create_embedding(self, user_history: List[Dict[str, Any]]) -> np.ndarray:
+    def create_embedding(self, user_history: UserHistory) -> np.ndarray:
         """
         Create a comprehensive behavioral embedding for a user.
 
@@ -61,11 +95,12 @@ class BehavioralEmbedder:
                     },
                     ...
                 ]
+                or a NumPy array with dtype SESSION_DTYPE.
 
         Returns:
             numpy array: Combined embedding vector
         """
-        if not user_history or len(user_history) == 0:
+        if user_history is None or len(user_history) == 0:
             # Return zero vector for empty history
             total_dim = self.embedding_dim + 15 + 5 + 5  # text + behavioral + temporal + constraint
             return np.zeros(total_dim)
@@ -73,6 +108,10 @@ class BehavioralEmbedder:
         # 1. Intent Sequence Embedding (semantic)
         intent_embedding = self._create_intent_sequence_embedding(user_history)
 
+        return self._combine_features(intent_embedding, user_history)
+
+    def _combine_features(self, intent_embedding: np.ndarray, user_history: UserHistory) -> np.ndarray:
+        """Append the statistical feature blocks to a precomputed intent embedding."""
         # 2. Behavioral Features (statistical)
         behavioral_features = self._extract_behavioral_features(user_history)
 
@@ -92,7 +131,7 @@ class BehavioralEmbedder:
 
         return full_embedding
 
-    def _create_intent_sequence_embedding(self, history: List[Dict[str, Any]]) -> np.ndarray:
+    def _create_intent_sequence_embedding(self, history: UserHistory) -> np.ndarray:
         """
         Create semantic embedding of intent sequence.
 
@@ -100,30 +139,59 @@ class BehavioralEmbedder:
 
         This captures the narrative arc of user behavior.
         """
+        # Encode using sentence transformer
+        embedding = self.text_encoder.encode(self._journey_description(history), convert_to_numpy=True)
+
+        return embedding
+
+    @staticmethod
+    def _is_structured(history: UserHistory) -> bool:
+        """Whether the history is a structured NumPy array rather than a list of dicts."""
+        return getattr(history, 'dtype', None) is not None and bool(history.dtype.names)
+
+    @staticmethod
+    def _column(history: np.ndarray, field: str) -> np.ndarray:
+        """Return one session field across a structured history."""
+        if field in history.dtype.names:
+            return history[field]
+        return np.full(len(history), SESSION_FIELD_DEFAULTS[field])
+
+    @staticmethod
+    def _contains_any(values: np.ndarray, *needles: str) -> np.ndarray:
+        """Boolean mask of values containing any of the substrings."""
+        mask = np.zeros(len(values), dtype=bool)
+        for needle in needles:
+            mask |= np.char.find(values, needle) >= 0
+        return mask
+
+    @classmethod
+    def _journey_description(cls, history: UserHistory) -> str:
+        """Render the intent sequence as the narrative text fed to the encoder."""
         # Extract intent labels in chronological order
-        intent_sequence = [record.get('intent', 'unknown') for record in history]
+        if cls._is_structured(history):
+            intent_sequence = cls._column(history, 'intent').tolist()
+        else:
+            intent_sequence = [record.get('intent', 'unknown') for record in history]
 
         # Create a narrative string (LLMs understand sequences in text form)
         intent_narrative = " -> ".join(intent_sequence)
 
         # Add context about the journey
-        journey_description = f"User journey: {intent_narrative}. Total steps: {len(intent_sequence)}."
-
-        # Encode using sentence transformer
-        embedding = self.text_encoder.encode(journey_description, convert_to_numpy=True)
+        return f"User journey: {intent_narrative}. Total steps: {len(intent_sequence)}."
 
-        return embedding
-
-    def _extract_behavioral_features(self, history: List[Dict[str, Any]]) -> np.ndarray:
+    def _extract_behavioral_features(self, history: UserHistory) -> np.ndarray:
         """
         Extract statistical behavioral features.
 
         From article: "Behavioral signature" includes session patterns,
         engagement depth, comparison behavior, etc.
         """
+        if self._is_structured(history):
+            return self._extract_structured_behavioral_features(history)
+
         # Session characteristics
         session_count = len(history)
-        avg_confidence = np.mean([r.get('confidence', 0.5) for r in history])
+        avg_confidence = np.fromiter((r.get('confidence', 0.5) for r in history), dtype=np.float64, count=session_count).mean()
 
         # Intent diversity (how many unique intents)
         unique_intents = len(set(r.get('intent', 'unknown') for r in history))
@@ -181,16 +249,52 @@ class BehavioralEmbedder:
             compare_count
         ], dtype=np.float32)
 
-    def _extract_temporal_features(self, history: List[Dict[str, Any]]) -> np.ndarray:
+    def _extract_structured_behavioral_features(self, history: np.ndarray) -> np.ndarray:
+        """Behavioral features for a structured history, computed column-wise."""
+        intents = self._column(history, 'intent').astype(str)
+        lowered = np.char.lower(intents)
+
+        session_count = len(history)
+        avg_confidence = self._column(history, 'confidence').astype(np.float64).mean()
+
+        unique_intents = len(np.unique(intents))
+        research_count = int(self._contains_any(lowered, 'research', 'browsing').sum())
+        compare_count = int(self._contains_any(lowered, 'compare', 'evaluate').sum())
+        decision_count = int(self._contains_any(lowered, 'ready', 'purchase').sum())
+        unique_channels = len(np.unique(self._column(history, 'channel')))
+
+        return np.array([
+            session_count,
+            avg_confidence,
+            unique_intents / session_count,
+            research_count / session_count,
+            compare_count / session_count,
+            decision_count / session_count,
+            np.isin(self._column(history, 'engagement_level'), ('high', 'very_high')).mean(),
+            unique_channels / session_count,
+            self._contains_any(lowered, 'deal', 'price').mean(),
+            self._contains_any(lowered, 'gift').mean(),
+            1.0 if decision_count > 0 else 0.0,
+            (session_count - unique_intents) / session_count,
+            unique_intents,
+            research_count,
+            compare_count
+        ], dtype=np.float32)
+
+    def _extract_temporal_features(self, history: UserHistory) -> np.ndarray:
         """
         Extract temporal behavioral patterns.
 
         From article: "Temporal pattern: [weekend_browser, evening_converter]"
         """
         # Parse timestamps
+        if self._is_structured(history):
+            timestamp_strings = self._column(history, 'timestamp').tolist()
+        else:
+            timestamp_strings = [record.get('timestamp', '') for record in history]
+
         timestamps = []
-        for record in history:
-            ts_str = record.get('timestamp', '')
+        for ts_str in timestamp_strings:
             if ts_str:
                 try:
                     timestamps.append(datetime.fromisoformat(ts_str.replace('Z', '+00:00')))
@@ -226,12 +330,15 @@ class BehavioralEmbedder:
             len(timestamps)
         ], dtype=np.float32)
 
-    def _extract_constraint_features(self, history: List[Dict[str, Any]]) -> np.ndarray:
+    def _extract_constraint_features(self, history: UserHistory) -> np.ndarray:
         """
         Extract constraint signals.
 
         From article: "Constraint profile: [budget_conscious, time_sensitive, knowledge_moderate]"
         """
+        if self._is_structured(history):
+            return self._extract_structured_constraint_features(history)
+
         # Budget constraints
         has_budget_constraint = sum(1 for r in history if r.get('has_budget_constraint', False))
         budget_constraint_ratio = has_budget_constraint / len(history)
@@ -246,24 +353,21 @@ class BehavioralEmbedder:
         knowledge_gap_ratio = has_knowledge_gap / len(history)
 
         # Urgency signals (high time pressure)
-        urgency_level = np.mean([
+        urgency_level = np.fromiter((
             1.0 if r.get('urgency_level', 'low') == 'high' else
             0.5 if r.get('urgency_level', 'low') == 'medium' else
             0.0
             for r in history
-        ])
+        ), dtype=np.float64, count=len(history)).mean()
 
         # Expertise level
-        expertise_scores = []
-        for r in history:
-            expertise = r.get('expertise_level', 'intermediate')
-            if expertise == 'expert':
-                expertise_scores.append(1.0)
-            elif expertise == 'intermediate':
-                expertise_scores.append(0.5)
-            else:  # novice
-                expertise_scores.append(0.0)
-        avg_expertise = np.mean(expertise_scores) if expertise_scores else 0.5
+        expertise_scores = np.fromiter((
+            1.0 if r.get('expertise_level', 'intermediate') == 'expert' else
+            0.5 if r.get('expertise_level', 'intermediate') == 'intermediate' else
+            0.0  # novice
+            for r in history
+        ), dtype=np.float64, count=len(history))
+        avg_expertise = expertise_scores.mean() if len(expertise_scores) else 0.5
 
         return np.array([
             budget_constraint_ratio,
@@ -273,12 +377,25 @@ class BehavioralEmbedder:
             avg_expertise
         ], dtype=np.float32)
 
+    def _extract_structured_constraint_features(self, history: np.ndarray) -> np.ndarray:
+        """Constraint features for a structured history, computed column-wise."""
+        urgency = self._column(history, 'urgency_level')
+        expertise = self._column(history, 'expertise_level')
+
+        return np.array([
+            self._column(history, 'has_budget_constraint').astype(bool).mean(),
+            self._column(history, 'has_time_constraint').astype(bool).mean(),
+            self._column(history, 'has_knowledge_gap').astype(bool).mean(),
+            np.where(urgency == 'high', 1.0, np.where(urgency == 'medium', 0.5, 0.0)).mean(),
+            np.where(expertise == 'expert', 1.0, np.where(expertise == 'intermediate', 0.5, 0.0)).mean()
+        ], dtype=np.float32)
+
     def get_embedding_dimension(self) -> int:
         """Get the total dimension of the combined embedding."""
         # text_embedding + behavioral (15) + temporal (5) + constraint (5)
         return self.embedding_dim + 15 + 5 + 5
 
-    def create_batch_embeddings(self, user_histories: List[List[Dict[str, Any]]]) -> np.ndarray:
+    def create_batch_embeddings(self, user_histories: List[UserHistory]) -> np.ndarray:
         """
         Create embeddings for multiple users efficiently.
 
@@ -293,12 +410,22 @@ class BehavioralEmbedder:
 
         print(f"🔄 Creating embeddings for {total} users...")
 
+        # Encode every journey narrative in one model call so the transformer
+        # batches internally instead of running a forward pass per user.
+        narratives = [self._journey_description(history) for history in user_histories if len(history)]
+        intent_embeddings = iter(
+            self.text_encoder.encode(narratives, convert_to_numpy=True) if narratives else ()
+        )
+
         for i, history in enumerate(user_histories):
             if i % 100 == 0 and i > 0:
                 print(f"   Progress: {i}/{total} ({i/total*100:.1f}%)")
 
-            embedding = self.create_embedding(history)
-            embeddings.append(embedding)
+            if len(history) == 0:
+                embeddings.append(np.zeros(self.get_embedding_dimension()))
+                continue
+
+            embeddings.append(self._combine_features(next(intent_embeddings), history))
 
         print(f"✅ Created {len(embeddings)} embeddings")
 
@@ -12,6 +12,7 @@ from src.activation import (
     IntentSignal,
 )
 from src.activation.audiences import AudienceManager, GoogleAdsAudienceConnector, MetaAdsAudienceConnector
+from src.activation.audiences.meta_ads import _normalize_identifiers
 
 
 def build_context() -> ActivationContext:
@@ -68,3 +69,375 @@ def test_audience_manager_missing_connector():
         assert "No audience connector" in str(exc)
     else:
         raise AssertionError("Expected ActivationError")
+
+
+def test_google_ads_parallel_hashing_matches_serial(monkeypatch):
+    from src.activation.audiences import google_ads
+
+    connector = GoogleAdsAudienceConnector(dry_run=True)
+    identifiers = [f" User{i}@Example.com " for i in range(25)] + [""]
+    serial = connector._hash_identifiers(identifiers)
+
+    monkeypatch.setattr(google_ads, "PARALLEL_HASH_THRESHOLD", 10)
+    monkeypatch.setattr(google_ads, "HASH_CHUNK_SIZE", 7)
+    parallel = connector._hash_identifiers(identifiers)
+
+    assert parallel == serial
+    assert len(parallel) == 25 * google_ads.DIGEST_SIZE
+
+
+def test_google_ads_reuses_hashes_for_resynced_cohort(monkeypatch):
+    connector = GoogleAdsAudienceConnector(dry_run=True)
+    cohort = AudienceCohort(name="Resync", description="", user_ids=["a@example.com", "b@example.com"])
+    first = connector._cached_hash_identifiers(cohort)
+
+    def fail_hashing(_identifiers):
+        raise AssertionError("identifiers should come from the cache")
+
+    monkeypatch.setattr(connector, "_hash_identifiers", fail_hashing)
+    second = connector._cached_hash_identifiers(cohort)
+
+    assert second == first
+    assert cohort.fingerprint() != AudienceCohort(name="Other", description="", user_ids=["a@example.com"]).fingerprint()
+
+
+def test_google_ads_hash_cache_is_bounded_by_bytes():
+    connector = GoogleAdsAudienceConnector(dry_run=True)
+    connector.hash_cache_bytes = 3 * 32
+    first = AudienceCohort(name="First", description="", user_ids=["a@example.com", "b@example.com"])
+    second = AudienceCohort(name="Second", description="", user_ids=["c@example.com", "d@example.com"])
+    oversized = AudienceCohort(name="Big", description="", user_ids=[f"user{i}@example.com" for i in range(4)])
+
+    connector._cached_hash_identifiers(first)
+    connector._cached_hash_identifiers(second)
+    connector._cached_hash_identifiers(oversized)
+
+    # The second cohort pushed the first out; the oversized one was never cached
+    assert [len(hashed) for hashed in connector._hash_cache.values()] == [64]
+    assert connector._hash_cache_used == 64
+
+
+class FakeRpcError(Exception):
+    """Stands in for a GoogleAdsException carrying a gRPC status."""
+
+    def __init__(self, status: str) -> None:
+        super().__init__(status)
+        self.error = self
+        self._status = type("StatusCode", (), {"name": status})()
+
+    def code(self):
+        return self._status
+
+
+def build_google_ads_uploader(monkeypatch) -> GoogleAdsAudienceConnector:
+    connector = GoogleAdsAudienceConnector(dry_run=True)
+    connector.dry_run = False
+    connector.client = object()
+    connector.batch_size = 2
+    monkeypatch.setattr("src.activation.audiences.google_ads.time.sleep", lambda _seconds: None)
+    monkeypatch.setattr(connector, "_create_or_get_user_list", lambda _cohort: "users/1")
+    return connector
+
+
+def test_google_ads_uploads_batches_concurrently_with_retry(monkeypatch):
+    connector = build_google_ads_uploader(monkeypatch)
+    created = []
+    failed_once = set()
+
+    def create_job(resource):
+        created.append(resource)
+        return f"jobs/{len(created)}"
+
+    def flaky_run(job_resource):
+        if job_resource not in failed_once:
+            failed_once.add(job_resource)
+            raise FakeRpcError("UNAVAILABLE")
+
+    monkeypatch.setattr(connector, "_create_job", create_job)
+    monkeypatch.setattr(connector, "_add_job_operations", lambda job_resource, batch: None)
+    monkeypatch.setattr(connector, "_run_job", flaky_run)
+    cohort = AudienceCohort(name="Upload", description="", user_ids=[f"user{i}@example.com" for i in range(5)])
+    result = connector.sync(cohort, build_context())
+
+    assert result["status"] == "uploaded"
+    assert [op["uploaded"] for op in result["operations"]] == [2, 2, 1]
+    # Retries resume the existing job instead of creating another one
+    assert len(created) == 3
+
+
+def test_google_ads_does_not_retry_permanent_errors(monkeypatch):
+    connector = build_google_ads_uploader(monkeypatch)
+    attempts = []
+
+    def failing_add(job_resource, batch):
+        attempts.append(job_resource)
+        raise FakeRpcError("PERMISSION_DENIED")
+
+    monkeypatch.setattr(connector, "_create_job", lambda resource: "jobs/1")
+    monkeypatch.setattr(connector, "_add_job_operations", failing_add)
+    cohort = AudienceCohort(name="Denied", description="", user_ids=["a@example.com"])
+
+    try:
+        connector.sync(cohort, build_context())
+    except ActivationError as exc:
+        assert "PERMISSION_DENIED" in str(exc)
+    else:
+        raise AssertionError("Expected ActivationError")
+    assert attempts == ["jobs/1"]
+
+
+def test_google_ads_dry_run_hashes_only_sample():
+    connector = GoogleAdsAudienceConnector(dry_run=True)
+    connector.batch_size = 4
+    user_ids = [f"user{i}@example.com" for i in range(10)] + [""]
+    result = connector.sync(AudienceCohort(name="Sample", description="", user_ids=user_ids), build_context())
+
+    assert result["user_count"] == 10
+    assert result["batch_count"] == 3
+    expected = connector._hash_identifiers(user_ids[:3]).hex()
+    assert "".join(result["sample_hash"]) == expected
+
+
+def test_google_ads_deduplicates_normalized_identifiers():
+    connector = GoogleAdsAudienceConnector(dry_run=True)
+    cohort = AudienceCohort(
+        name="Dupes",
+        description="",
+        user_ids=["a@example.com", " A@Example.com ", "b@example.com", "", "a@example.com"],
+    )
+    result = connector.sync(cohort, build_context())
+
+    assert result["user_count"] == 2
+    assert result["duplicate_count"] == 2
+    assert len(connector._hash_identifiers(cohort.user_ids)) == 2 * 32
+
+
+def test_meta_ads_hashes_match_hexdigest():
+    import hashlib
+
+    connector = MetaAdsAudienceConnector(dry_run=True)
+    connector._salted_hash = hashlib.sha256(b"pepper")
+    identifiers = [" Alpha@Example.com", "", "beta@example.com "]
+
+    expected = [
+        hashlib.sha256(("pepper" + value.strip().lower()).encode("utf-8")).hexdigest()
+        for value in identifiers
+        if value
+    ]
+    normalized = _normalize_identifiers(identifiers)
+    assert [digest.hex() for digest in connector._hash_identifiers(normalized)] == expected
+
+
+def test_meta_ads_deduplicates_normalized_identifiers():
+    connector = MetaAdsAudienceConnector(dry_run=True)
+    cohort = AudienceCohort(
+        name="Dupes",
+        description="",
+        user_ids=["a@example.com", "A@example.com ", "", "b@example.com", "a@example.com"],
+    )
+    result = connector.sync(cohort, build_context())
+
+    assert result["user_count"] == 2
+    assert result["duplicate_count"] == 2
+
+
+def test_meta_ads_streams_batches():
+    connector = MetaAdsAudienceConnector(dry_run=True)
+    connector.batch_size = 4
+    cohort = AudienceCohort(name="Stream", description="", user_ids=[f"user{i}@example.com" for i in range(10)])
+    result = connector.sync(cohort, build_context())
+
+    assert result["user_count"] == 10
+    assert result["batch_count"] == 3
+    assert result["sample_hash"] == [digest.hex() for digest in connector._hash_identifiers(cohort.user_ids[:3])]
+
+
+def test_meta_ads_parallel_hashing_matches_serial(monkeypatch):
+    from src.activation.audiences import meta_ads
+
+    connector = MetaAdsAudienceConnector(dry_run=True)
+    connector.batch_size = 4
+    identifiers = _normalize_identifiers(f"user{i}@example.com" for i in range(25))
+    serial = list(connector._hashed_batches(identifiers))
+
+    monkeypatch.setattr(meta_ads, "PARALLEL_HASH_THRESHOLD", 10)
+    parallel = list(connector._hashed_batches(identifiers))
+
+    assert parallel == serial
+    assert len(parallel) == 7
+
+
+def build_meta_ads_uploader(monkeypatch) -> MetaAdsAudienceConnector:
+    connector = MetaAdsAudienceConnector(dry_run=True)
+    connector.dry_run = False
+    connector.api_initialized = True
+    connector.batch_size = 2
+    monkeypatch.setattr("src.activation.audiences.meta_ads.time.sleep", lambda _seconds: None)
+    monkeypatch.setattr(connector, "_create_or_get_audience", lambda _cohort: "aud_1")
+    return connector
+
+
+def test_meta_ads_uploads_batches_concurrently_with_retry(monkeypatch):
+    connector = build_meta_ads_uploader(monkeypatch)
+    sent = []
+    failed_once = set()
+
+    def flaky_upload(audience_id, group):
+        responses = []
+        for batch in group:
+            sent.append(bytes(batch))
+            if bytes(batch) in failed_once or len(batch) < 64:
+                responses.append({"code": 200, "body": "{}"})
+            else:
+                failed_once.add(bytes(batch))
+                responses.append({"code": 400, "body": '{"error": {"code": 17}}'})
+        return responses
+
+    monkeypatch.setattr("src.activation.audiences.meta_ads.GRAPH_BATCH_LIMIT", 3)
+    monkeypatch.setattr(connector, "_upload_group", flaky_upload)
+    cohort = AudienceCohort(name="Upload", description="", user_ids=[f"user{i}@example.com" for i in range(5)])
+    result = connector.sync(cohort, build_context())
+
+    assert result["status"] == "uploaded"
+    assert result["user_count"] == 5
+    assert [op["uploaded"] for op in result["operations"]] == [2, 2, 1]
+    # Only the two throttled sub-requests are re-sent; the accepted one goes out once
+    assert len(sent) == 5
+    assert sent[3:] == sent[:2]
+
+
+def test_meta_ads_does_not_retry_permanent_errors(monkeypatch):
+    class FakeFacebookRequestError(Exception):
+        def http_status(self):
+            return 400
+
+        def api_error_code(self):
+            return 190
+
+    connector = build_meta_ads_uploader(monkeypatch)
+    attempts = []
+
+    def rejected_upload(audience_id, group):
+        attempts.append(group)
+        raise FakeFacebookRequestError("Invalid OAuth access token")
+
+    monkeypatch.setattr(connector, "_upload_group", rejected_upload)
+    cohort = AudienceCohort(name="Denied", description="", user_ids=["a@example.com"])
+
+    try:
+        connector.sync(cohort, build_context())
+    except ActivationError as exc:
+        assert "Invalid OAuth access token" in str(exc)
+    else:
+        raise AssertionError("Expected ActivationError")
+    assert len(attempts) == 1
+
+    monkeypatch.setattr(
+        connector, "_upload_group", lambda audience_id, group: attempts.append(group) or [{"code": 400, "body": '{"error": {"code": 100}}'}]
+    )
+    try:
+        connector.sync(cohort, build_context())
+    except ActivationError as exc:
+        assert "rejected" in str(exc)
+    else:
+        raise AssertionError("Expected ActivationError")
+    assert len(attempts) == 2
+
+
+def test_meta_ads_groups_batches_into_graph_batch_call():
+    import json
+    from types import SimpleNamespace
+    from urllib.parse import parse_qs
+
+    calls = []
+
+    class FakeApi:
+        def call(self, method, path, params=None):
+            sub_requests = json.loads(params["batch"])
+            calls.append(sub_requests)
+            return SimpleNamespace(json=lambda: [{"code": 200, "body": "{}"} for _ in sub_requests])
+
+    connector = MetaAdsAudienceConnector(dry_run=True)
+    connector.api = FakeApi()
+
+    responses = connector._upload_group("aud_1", [bytearray(b"\x01" * 32 + b"\x02" * 32), bytearray(b"\xab" * 32)])
+
+    assert [response["code"] for response in responses] == [200, 200]
+    assert len(calls) == 1
+    assert [request["relative_url"] for request in calls[0]] == ["aud_1/users", "aud_1/users"]
+    payloads = [json.loads(parse_qs(request["body"])["payload"][0]) for request in calls[0]]
+    assert payloads == [
+        {"schema": "EMAIL_SHA256", "data": ["01" * 32, "02" * 32]},
+        {"schema": "EMAIL_SHA256", "data": ["ab" * 32]},
+    ]
+
+
+def test_audience_config_reparsed_only_when_file_changes(tmp_path):
+    import os
+
+    from src.activation.config_loader import load_yaml_config
+
+    config_file = tmp_path / "audiences.yaml"
+    config_file.write_text("meta_ads:\n  batch_size: 10\n", encoding="utf-8")
+    first = load_yaml_config(config_file)
+    assert load_yaml_config(config_file) is first
+
+    config_file.write_text("meta_ads:\n  batch_size: 20\n", encoding="utf-8")
+    stat = config_file.stat()
+    os.utime(config_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    connector = MetaAdsAudienceConnector(config_path=str(config_file), dry_run=True)
+    assert connector.batch_size == 20
+
+
+def test_loaded_config_is_frozen_recursively(tmp_path):
+    from src.activation.config_loader import load_yaml_config
+
+    config_file = tmp_path / "frozen.yaml"
+    config_file.write_text("section:\n  items: [a, b]\n  nested:\n    key: 1\n", encoding="utf-8")
+    config = load_yaml_config(config_file)
+
+    assert config["section"]["items"] == ("a", "b")
+    try:
+        config["section"]["nested"]["key"] = 2
+    except TypeError:
+        pass
+    else:
+        raise AssertionError("Expected nested config sections to be read-only")
+
+
+def test_meta_ads_parallel_hashing_bounds_lookahead(monkeypatch):
+    from concurrent.futures import Future
+
+    from src.activation.audiences import meta_ads
+
+    class InlinePool:
+        submitted = 0
+
+        def __init__(self, max_workers):
+            self.max_workers = max_workers
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def submit(self, fn, *args):
+            InlinePool.submitted += 1
+            future = Future()
+            future.set_result(fn(*args))
+            return future
+
+    monkeypatch.setattr(meta_ads, "PARALLEL_HASH_THRESHOLD", 10)
+    monkeypatch.setattr(meta_ads, "ProcessPoolExecutor", InlinePool)
+    monkeypatch.setattr(meta_ads.os, "cpu_count", lambda: 2)
+    connector = MetaAdsAudienceConnector(dry_run=True)
+    connector.batch_size = 4
+    identifiers = _normalize_identifiers(f"user{i}@example.com" for i in range(100))
+
+    batches = connector._hashed_batches(identifiers)
+    first = next(batches)
+
+    assert InlinePool.submitted == 5  # 2 workers x 2 lookahead, plus one refill
+    assert first + b"".join(batches) == meta_ads._hash_chunk(identifiers, connector._salt_bytes)
+    assert InlinePool.submitted == 25
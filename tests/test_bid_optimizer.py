@@ -74,3 +74,64 @@ def test_bid_optimizer_respects_channel_overrides():
     assert rec_meta.metadata["channel"] == "meta_ads"
     assert rec_google.metadata["channel"] == "google_ads"
     assert rec_meta.bid_modifier != rec_google.bid_modifier
+
+
+def test_bid_optimizer_caches_channel_settings():
+    taxonomy = IntentTaxonomy.from_domain("ecommerce")
+    optimizer = IntentAwareBidOptimizer(taxonomy)
+    context = build_sample_context()
+
+    first = optimizer.recommend(context)
+    settings = optimizer._channel_settings("google_ads")
+    second = optimizer.recommend(context)
+
+    assert optimizer._channel_settings("google_ads") is settings
+    assert optimizer._channel_params("google_ads").base_cpc == settings["defaults"]["base_cpc"]
+    assert "google_ads" in optimizer._conversion_models
+    assert second.bid_modifier == first.bid_modifier
+    try:
+        settings["defaults"]["base_cpc"] = 0.0
+    except TypeError:
+        pass
+    else:
+        raise AssertionError("Expected cached channel settings to be read-only")
+
+
+def test_conversion_model_batch_matches_scalar_predictions():
+    taxonomy = IntentTaxonomy.from_domain("ecommerce")
+    model = ConversionModel(taxonomy, config={"stage_multipliers": {"decision": 1.1}})
+    full = build_sample_context()
+    no_persona = ActivationContext(intents=full.intents, metrics={"historical_cvr": 0.01})
+    browsing = ActivationContext(
+        intents=[IntentSignal(label="browsing_inspiration", confidence=0.3, stage="awareness", evidence=[])]
+    )
+    no_intent = ActivationContext(intents=[], persona=full.persona)
+    contexts = [full, no_persona, browsing, no_intent]
+
+    batch = model.predict_batch(contexts)
+
+    expected = [model.predict(context).probability for context in contexts]
+    assert batch.shape == (4,)
+    assert all(math.isclose(a, b, rel_tol=1e-12) for a, b in zip(batch, expected))
+
+
+def test_bid_optimizer_batch_matches_scalar_recommendations():
+    taxonomy = IntentTaxonomy.from_domain("ecommerce")
+    optimizer = IntentAwareBidOptimizer(taxonomy=taxonomy)
+    full = build_sample_context()
+    meta = build_sample_context()
+    meta.metadata["channel"] = "meta_ads"
+    sparse = ActivationContext(
+        intents=[IntentSignal(label="browsing_inspiration", confidence=0.2, stage="awareness", evidence=[])]
+    )
+    contexts = [full, sparse, meta]
+
+    batch = optimizer.recommend_batch(contexts)
+
+    for recommendation, context in zip(batch, contexts):
+        expected = optimizer.recommend(context)
+        assert math.isclose(recommendation.base_bid, expected.base_bid, abs_tol=1e-4)
+        assert math.isclose(recommendation.bid_modifier, expected.bid_modifier, abs_tol=1e-4)
+        assert recommendation.metadata["pacing"] == expected.metadata["pacing"]
+        assert recommendation.metadata["channel"] == expected.metadata["channel"]
+        assert recommendation.rationale == expected.rationale
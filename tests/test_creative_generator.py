@@ -89,3 +89,33 @@ def test_creative_brief_generator_llm_mode_uses_provider():
     sections = brief["sections"]
     assert sections["objective"] == "Drive confidence for product X."
     assert sections["call_to_action"] == "See side-by-side comparison"
+
+
+def test_creative_brief_generator_tries_env_provider_once(monkeypatch):
+    from src.activation.creative import generator as generator_module
+
+    attempts = []
+
+    def failing_factory():
+        attempts.append(1)
+        raise RuntimeError("no credentials")
+
+    monkeypatch.setattr(generator_module.LLMProviderFactory, "create_from_env", staticmethod(failing_factory))
+    generator = CreativeBriefGenerator(use_llm=True)
+    generator._llm_config = {"enabled": True}
+
+    first = generator.run(build_context())
+    second = generator.run(build_context())
+
+    assert first.metadata["mode"] == second.metadata["mode"] == "template"
+    assert len(attempts) == 1
+
+
+def test_creative_brief_generator_parses_or_falls_back_on_llm_text():
+    sections = {"objective": {}, "key_message": {}}
+
+    parsed = CreativeBriefGenerator._parse_llm_response('{"objective": "Win", "key_message": 3}', sections)
+    fallback = CreativeBriefGenerator._parse_llm_response("not json", sections)
+
+    assert parsed == {"objective": "Win", "key_message": "3"}
+    assert fallback == {"objective": "not json", "key_message": "not json"}
@@ -15,6 +15,24 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 from src.intent.engine import IntentRecognitionEngine
 from src.intent.taxonomy import IntentTaxonomy
 from src.utils.context_builder import ContextBuilder
+from src.intent.llm_provider import BaseLLMProvider
+
+
+class StubLLMProvider(BaseLLMProvider):
+    """Provider returning a fixed JSON payload."""
+
+    def __init__(self, response: str = '{"primary_intent": "compare_options", "confidence": 0.7}'):
+        self.response = response
+        self.calls = 0
+        self.cacheable_prefixes = []
+
+    async def generate(self, prompt: str, system_prompt: str = "", cacheable_prefix: str = "") -> str:
+        return self.generate_sync(prompt, system_prompt, cacheable_prefix)
+
+    def generate_sync(self, prompt: str, system_prompt: str = "", cacheable_prefix: str = "") -> str:
+        self.calls += 1
+        self.cacheable_prefixes.append(cacheable_prefix)
+        return self.response
 
 
 class TestContextBuilder:
@@ -116,6 +134,36 @@ class TestIntentTaxonomy:
         assert "ready_to_purchase" in taxonomy.get_all_intent_labels()
         assert "compare_options" in taxonomy.get_all_intent_labels()
 
+    def test_taxonomy_load_is_cached_until_file_changes(self, tmp_path):
+        """Test that unchanged taxonomy files are parsed once and edits are picked up."""
+        path = tmp_path / "custom.yaml"
+        path.write_text("name: First\nintents:\n  browse: {stage: awareness}\n")
+
+        first = IntentTaxonomy.from_domain("custom", config_dir=str(tmp_path))
+        assert IntentTaxonomy.from_file(str(path)) is first
+
+        path.write_text("name: Second\nintents:\n  browse: {stage: awareness}\n")
+        os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1_000_000))
+
+        assert IntentTaxonomy.from_file(str(path)).name == "Second"
+
+    def test_taxonomy_json_sidecar(self, tmp_path):
+        """Test that a JSON sidecar is written on first load and used while newer than the YAML."""
+        from src.intent.taxonomy import _read_taxonomy_data
+
+        path = tmp_path / "custom.yaml"
+        path.write_text("name: Yaml\nintents:\n  browse: {stage: awareness}\n")
+        mtime_ns = os.stat(path).st_mtime_ns
+
+        data = _read_taxonomy_data(str(path), mtime_ns)
+        sidecar = tmp_path / "custom.yaml.json"
+        assert json.loads(sidecar.read_text()) == data
+
+        sidecar.write_text('{"name": "Json"}')
+        os.utime(sidecar, ns=(0, mtime_ns + 1_000_000))
+        assert _read_taxonomy_data(str(path), mtime_ns)["name"] == "Json"
+        assert _read_taxonomy_data(str(path), mtime_ns + 2_000_000)["name"] == "Yaml"
+
     def test_get_intent_definition(self):
         """Test retrieving intent definitions."""
         taxonomy = IntentTaxonomy.from_domain("ecommerce")
@@ -135,6 +183,24 @@ class TestIntentTaxonomy:
         assert len(decision_intents) > 0
         assert "ready_to_purchase" in decision_intents
 
+    def test_confidence_modifier_precedence(self):
+        """Test that strong signals win over weak and temporal ones for the same name."""
+        taxonomy = IntentTaxonomy({
+            "intents": {"browse": {"stage": "awareness"}},
+            "confidence_modifiers": {
+                "strong_signals": {"shared": 0.3},
+                "weak_signals": {"shared": -0.1, "bounce": -0.2},
+                "temporal_factors": {"bounce": 0.5, "weekend": 0.05},
+            },
+        })
+
+        assert taxonomy.get_confidence_modifier("shared") == 0.3
+        assert taxonomy.get_confidence_modifier("bounce") == -0.2
+        assert taxonomy.get_confidence_modifier("weekend") == 0.05
+        assert taxonomy.get_confidence_modifier("missing") == 0.0
+        assert taxonomy.get_intents_by_stage("awareness") == ["browse"]
+        assert taxonomy.get_intents_by_stage("decision") == []
+
     def test_recommended_actions(self):
         """Test getting recommended actions."""
         taxonomy = IntentTaxonomy.from_domain("ecommerce")
@@ -219,6 +285,376 @@ class TestIntentRecognitionEngine:
         assert "behavioral_evidence" in fixed
         assert "predicted_next_actions" in fixed
 
+    def test_build_prompt_uses_precompiled_taxonomy(self):
+        """Test that the prompt carries taxonomy definitions and the request context."""
+        taxonomy = IntentTaxonomy.from_domain("ecommerce")
+        engine = IntentRecognitionEngine(llm_provider=StubLLMProvider(), taxonomy=taxonomy)
+
+        prompt = engine._build_prompt("DEVICE: mobile")
+
+        assert taxonomy.format_for_llm() in prompt
+        assert "DEVICE: mobile" in prompt
+        assert "{intent_definitions}" not in prompt
+        assert "{behavioral_signals}" not in prompt
+
+    def test_swapping_taxonomy_rebuilds_prompt(self):
+        """Test that assigning a new taxonomy refreshes the pre-rendered prompt."""
+        engine = IntentRecognitionEngine(llm_provider=StubLLMProvider(), taxonomy=IntentTaxonomy.from_domain("ecommerce"))
+        replacement = IntentTaxonomy({"intents": {"custom_intent": {"description": "Custom", "stage": "awareness"}}})
+
+        engine.taxonomy = replacement
+
+        assert "CUSTOM_INTENT:" in engine._build_prompt("DEVICE: mobile")
+        assert engine._parse_natural_language_response("custom intent")["primary_intent"] == "custom_intent"
+
+    def test_parse_takes_first_json_object(self):
+        """Test JSON extraction when the response has prose, braces in strings and a second object."""
+        engine = IntentRecognitionEngine(llm_provider=StubLLMProvider(), taxonomy=IntentTaxonomy.from_domain("ecommerce"))
+
+        raw = 'Analysis:\n{"primary_intent": "compare_options", "justification": "saw {specs}", "confidence": 0.8}\nAlt: {"primary_intent": "browse"}'
+        result = engine._parse_llm_response(raw)
+
+        assert result["primary_intent"] == "compare_options"
+        assert result["justification"] == "saw {specs}"
+        assert result["confidence"] == 0.8
+
+    def test_exact_cache_hits_for_repeated_request(self):
+        """Test that repeating a request is served from the exact cache despite a new timestamp."""
+        llm = StubLLMProvider()
+        engine = IntentRecognitionEngine(llm_provider=llm, taxonomy=IntentTaxonomy.from_domain("ecommerce"))
+
+        first = engine.recognize_intent(user_query="running shoes", page_type="search_results", time_on_page=60)
+        second = engine.recognize_intent(user_query="running shoes", page_type="search_results", time_on_page=60)
+
+        assert second is first
+        assert llm.calls == 1
+        key = engine._generate_cache_key("DEVICE: mobile")
+        assert len(key) == 32 and key == engine._generate_cache_key("DEVICE: mobile")
+
+    def test_result_cache_evicts_and_expires(self):
+        """Test LRU eviction and TTL expiry in the exact result cache."""
+        from src.intent import ResultCache
+
+        now = [0.0]
+        cache = ResultCache(capacity=2, ttl=10.0, clock=lambda: now[0])
+        cache.store("a", {"id": "a"})
+        cache.store("b", {"id": "b"})
+        assert cache.lookup("a") == {"id": "a"}
+        cache.store("c", {"id": "c"})
+
+        assert len(cache) == 2
+        assert cache.lookup("b") is None
+        now[0] = 11.0
+        assert cache.lookup("a") is None
+        assert len(cache) == 1
+
+    def test_redis_cache_backend_round_trips_results(self):
+        """Test that a Redis-backed exact cache serves results across engines."""
+        import fnmatch
+        from src.intent import RedisResultCache
+
+        class FakeRedis(dict):
+            def set(self, key, value, ex=None):
+                self[key] = value
+
+            def scan_iter(self, match):
+                return [key for key in list(self) if fnmatch.fnmatch(key, match)]
+
+            def delete(self, *keys):
+                for key in keys:
+                    self.pop(key, None)
+
+        client = FakeRedis()
+        llm = StubLLMProvider()
+        taxonomy = IntentTaxonomy.from_domain("ecommerce")
+        first_engine = IntentRecognitionEngine(llm_provider=llm, taxonomy=taxonomy, cache_backend=RedisResultCache(client=client))
+        second_engine = IntentRecognitionEngine(llm_provider=llm, taxonomy=taxonomy, cache_backend=RedisResultCache(client=client))
+
+        first = first_engine.recognize_intent(user_query="running shoes", page_type="search_results")
+        second = second_engine.recognize_intent(user_query="running shoes", page_type="search_results")
+
+        assert second == first
+        assert llm.calls == 1
+        assert second_engine.get_cache_stats()["size"] == 1
+        second_engine.clear_cache()
+        assert not client
+
+        b2b_engine = IntentRecognitionEngine(
+            llm_provider=llm,
+            taxonomy=IntentTaxonomy({
+                "name": "B2B SaaS",
+                "intents": {"request_demo": {"description": "Wants a demo", "stage": "decision"}},
+            }),
+            cache_backend=RedisResultCache(client=client),
+        )
+        first_engine.recognize_intent(user_query="running shoes", page_type="search_results")
+        b2b_engine.recognize_intent(user_query="running shoes", page_type="search_results")
+
+        # Different taxonomies never share a key, even on the same Redis
+        assert llm.calls == 3
+        assert len(client) == 2
+
+    def test_natural_language_parse_prefers_taxonomy_order(self):
+        """Test that the fallback parser picks the first taxonomy intent mentioned, not the first in the text."""
+        taxonomy = IntentTaxonomy.from_domain("ecommerce")
+        engine = IntentRecognitionEngine(llm_provider=StubLLMProvider(), taxonomy=taxonomy)
+        first, second = taxonomy.get_all_intent_labels()[:2]
+
+        text = f"Mostly {second.replace('_', ' ')}, maybe {first.replace('_', ' ')}. High confidence."
+        result = engine._parse_natural_language_response(text)
+
+        assert result["primary_intent"] == first
+        assert result["confidence"] == 0.85
+        assert engine._parse_natural_language_response("no idea")["primary_intent"] == "unknown"
+
+    def test_taxonomy_sent_as_cacheable_prefix(self):
+        """Test that the taxonomy travels in the request-independent prompt prefix."""
+        taxonomy = IntentTaxonomy.from_domain("ecommerce")
+        llm = StubLLMProvider()
+        engine = IntentRecognitionEngine(llm_provider=llm, taxonomy=taxonomy, enable_caching=False)
+
+        prefix, rest = engine._split_prompt("DEVICE: mobile")
+        engine.recognize_intent(user_query="running shoes", page_type="search_results")
+        engine.recognize_intent(user_query="garden hose", page_type="homepage")
+
+        assert prefix + rest == engine._build_prompt("DEVICE: mobile")
+        assert taxonomy.format_for_llm() in prefix
+        assert "DEVICE: mobile" not in prefix
+        assert llm.cacheable_prefixes == [prefix, prefix]
+
+    def test_provider_without_cacheable_prefix_still_works(self):
+        """Test that providers with the pre-caching signature get the prefix prepended."""
+        import asyncio
+
+        class LegacyProvider(BaseLLMProvider):
+            def __init__(self):
+                self.prompts = []
+
+            async def generate(self, prompt: str, system_prompt: str = "") -> str:
+                return self.generate_sync(prompt, system_prompt)
+
+            def generate_sync(self, prompt: str, system_prompt: str = "") -> str:
+                self.prompts.append(prompt)
+                return '{"primary_intent": "compare_options", "confidence": 0.7}'
+
+        taxonomy = IntentTaxonomy.from_domain("ecommerce")
+        llm = LegacyProvider()
+        engine = IntentRecognitionEngine(llm_provider=llm, taxonomy=taxonomy, enable_caching=False)
+
+        sync_result = engine.recognize_intent(user_query="running shoes", page_type="search_results")
+        async_result = asyncio.run(
+            engine.recognize_intent_async(user_query="garden hose", page_type="homepage")
+        )
+
+        assert sync_result["primary_intent"] == "compare_options"
+        assert async_result["primary_intent"] == "compare_options"
+        assert all(taxonomy.format_for_llm() in prompt for prompt in llm.prompts)
+        assert len(llm.prompts) == 2
+
+    def test_async_requests_are_dispatched_together(self):
+        """Test that concurrent async requests reach the provider in one concurrent batch."""
+        import asyncio
+
+        class SlowProvider(StubLLMProvider):
+            in_flight = peak = 0
+
+            async def generate(self, prompt: str, system_prompt: str = "", cacheable_prefix: str = "") -> str:
+                self.in_flight += 1
+                self.peak = max(self.peak, self.in_flight)
+                await asyncio.sleep(0.01)
+                self.in_flight -= 1
+                return self.generate_sync(prompt, system_prompt, cacheable_prefix)
+
+        llm = SlowProvider()
+        engine = IntentRecognitionEngine(
+            llm_provider=llm,
+            taxonomy=IntentTaxonomy.from_domain("ecommerce"),
+            batch_window=0.01,
+        )
+
+        async def run():
+            return await asyncio.gather(*(
+                engine.recognize_intent_async(user_query=query, page_type="search_results")
+                for query in ("running shoes", "garden hose", "desk lamp")
+            ))
+
+        results = asyncio.run(run())
+
+        assert [r["primary_intent"] for r in results] == ["compare_options"] * 3
+        assert llm.calls == 3
+        assert llm.peak == 3
+
+    def test_identical_async_requests_share_one_llm_call(self):
+        """Test that concurrent identical async requests are coalesced into one LLM call."""
+        import asyncio
+
+        llm = StubLLMProvider()
+        engine = IntentRecognitionEngine(
+            llm_provider=llm,
+            taxonomy=IntentTaxonomy.from_domain("ecommerce"),
+            batch_window=0.01,
+        )
+
+        async def run():
+            return await asyncio.gather(*(
+                engine.recognize_intent_async(user_query="running shoes", page_type="search_results")
+                for _ in range(5)
+            ))
+
+        results = asyncio.run(run())
+
+        assert llm.calls == 1
+        assert all(result is results[0] for result in results)
+        assert not engine._inflight
+
+    def test_cancelled_async_leader_does_not_fail_followers(self):
+        """Test that cancelling the first of two identical async requests leaves the second intact."""
+        import asyncio
+
+        llm = StubLLMProvider()
+        engine = IntentRecognitionEngine(
+            llm_provider=llm,
+            taxonomy=IntentTaxonomy.from_domain("ecommerce"),
+            batch_window=0.01,
+        )
+
+        async def run():
+            leader = asyncio.create_task(
+                engine.recognize_intent_async(user_query="running shoes", page_type="search_results")
+            )
+            follower = asyncio.create_task(
+                engine.recognize_intent_async(user_query="running shoes", page_type="search_results")
+            )
+            await asyncio.sleep(0)
+            leader.cancel()
+            return await follower, leader.cancelled()
+
+        result, leader_cancelled = asyncio.run(run())
+
+        assert leader_cancelled
+        assert result["primary_intent"] == "compare_options"
+        assert llm.calls == 1
+        assert not engine._inflight
+
+    def test_semantic_cache_reuses_result_for_similar_context(self):
+        """Test that near-identical contexts are served from the bucket and semantic tiers."""
+        import numpy as np
+        from src.intent import SemanticCache
+
+        def topic_encoder(text: str):
+            return np.array([1.0, 0.0]) if "running shoes" in text else np.array([0.0, 1.0])
+
+        llm = StubLLMProvider()
+        engine = IntentRecognitionEngine(
+            llm_provider=llm,
+            taxonomy=IntentTaxonomy.from_domain("ecommerce"),
+            semantic_cache=SemanticCache(topic_encoder, capacity=2),
+        )
+
+        first = engine.recognize_intent(user_query="running shoes", page_type="search_results", time_on_page=60)
+        second = engine.recognize_intent(user_query="running shoes", page_type="search_results", time_on_page=61)
+        third = engine.recognize_intent(user_query="running shoes", page_type="search_results", time_on_page=200)
+        engine.recognize_intent(user_query="garden hose", page_type="search_results", time_on_page=60)
+
+        assert second is first
+        assert third is first
+        assert llm.calls == 2
+        stats = engine.get_cache_stats()
+        assert stats["bucket_hits"] == 1
+        assert stats["semantic_hits"] == 1
+
+    def test_sentence_encoder_is_shared(self):
+        """Test that the sentence encoder is loaded once per model name and shared."""
+        from src.intent.embedder import get_sentence_encoder
+
+        loads = []
+
+        def loader(name):
+            loads.append(name)
+            return object()
+
+        first = get_sentence_encoder("stub-model", loader=loader)
+
+        assert get_sentence_encoder("stub-model", loader=loader) is first
+        assert get_sentence_encoder("other-model", loader=loader) is not first
+        assert loads == ["stub-model", "other-model"]
+
+    def test_semantic_cache_evicts_least_recently_used(self):
+        """Test LRU eviction in the semantic cache."""
+        import numpy as np
+        from src.intent import SemanticCache
+
+        cache = SemanticCache(lambda text: np.eye(3)[int(text)], capacity=2)
+        embeddings = [cache.encode(str(i)) for i in range(3)]
+        cache.store(embeddings[0], {"id": 0})
+        cache.store(embeddings[1], {"id": 1})
+        assert cache.lookup(embeddings[0]) == {"id": 0}
+        cache.store(embeddings[2], {"id": 2})
+
+        assert len(cache) == 2
+        assert cache.lookup(embeddings[1]) is None
+        assert cache.lookup(embeddings[0]) == {"id": 0}
+        assert cache.lookup(embeddings[2]) == {"id": 2}
+
+    def test_semantic_cache_never_mismatches_under_threads(self):
+        """Test that concurrent stores and lookups only return the result stored with an embedding."""
+        import numpy as np
+        from concurrent.futures import ThreadPoolExecutor
+        from src.intent import SemanticCache
+
+        cache = SemanticCache(lambda text: np.eye(16)[int(text)], capacity=4)
+        embeddings = [cache.encode(str(i)) for i in range(16)]
+
+        def churn(worker):
+            mismatches = 0
+            for step in range(500):
+                i = (worker * 7 + step) % 16
+                cache.store(embeddings[i], {"id": i})
+                hit = cache.lookup(embeddings[(i + 1) % 16])
+                mismatches += hit is not None and hit["id"] != (i + 1) % 16
+            return mismatches
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            assert sum(pool.map(churn, range(8))) == 0
+        assert len(cache) == 4
+
+
+class TestOpenRouterProvider:
+    """Test the OpenRouter provider's pooled async client."""
+
+    def test_async_client_closed_with_its_event_loop(self, monkeypatch):
+        """Test that each event loop's pooled client is closed before the loop goes away."""
+        import asyncio
+        httpx = pytest.importorskip("httpx")
+        from src.intent import llm_provider
+
+        clients = []
+        real_client = httpx.AsyncClient
+
+        def mock_client(**kwargs):
+            def reply(request):
+                return httpx.Response(200, json={"choices": [{"message": {"content": "ok"}}]})
+
+            client = real_client(transport=httpx.MockTransport(reply), **kwargs)
+            clients.append(client)
+            return client
+
+        monkeypatch.setattr(llm_provider.httpx, "AsyncClient", mock_client)
+        provider = llm_provider.OpenRouterProvider(api_key="test-key")
+
+        assert asyncio.run(provider.generate("hi")) == "ok"
+        assert asyncio.run(provider.generate("hi")) == "ok"
+        assert len(clients) == 2
+        assert all(client.is_closed for client in clients)
+
+        async def call_then_close():
+            await provider.generate("hi")
+            await provider.aclose()
+
+        asyncio.run(call_then_close())
+        assert clients[-1].is_closed
+        assert provider._async_http is None
+
 
 class TestSampleContexts:
     """Test with sample context data."""
@@ -13,7 +13,7 @@ import pandas as pd
 import numpy as np
 from unittest.mock import MagicMock, patch
 from src.utils.data_parsers import parse_user_histories_from_csv, parse_user_histories_from_json
-from src.patterns.embedder import BehavioralEmbedder
+from src.patterns.embedder import SESSION_DTYPE, BehavioralEmbedder
 from src.patterns.clustering import PatternClusterer
 from src.patterns.analyzer import PatternAnalyzer
 
@@ -59,7 +59,9 @@ def test_embedder(mock_transformer):
     # Mock the transformer to return fixed embeddings
     mock_model = MagicMock()
     mock_model.get_sentence_embedding_dimension.return_value = 384
-    mock_model.encode.return_value = np.zeros(384)
+    mock_model.encode.side_effect = lambda texts, **_: (
+        np.zeros((len(texts), 384)) if isinstance(texts, list) else np.zeros(384)
+    )
     mock_transformer.return_value = mock_model
 
     embedder = BehavioralEmbedder()
@@ -71,6 +73,28 @@ def test_embedder(mock_transformer):
     # total_dim = 384 + 15 + 5 + 5 = 409
     assert embeddings.shape == (2, 409)
 
+@patch("src.patterns.embedder.SentenceTransformer")
+def test_embedder_accepts_structured_histories(mock_transformer):
+    mock_model = MagicMock()
+    mock_model.get_sentence_embedding_dimension.return_value = 384
+    mock_model.encode.side_effect = lambda texts, **_: np.zeros((len(texts), 384))
+    mock_transformer.return_value = mock_model
+
+    embedder = BehavioralEmbedder()
+    histories, _ = parse_user_histories_from_csv(SAMPLE_CSV)
+    structured = [
+        np.array([tuple(session[name] for name in SESSION_DTYPE.names) for session in history], dtype=SESSION_DTYPE)
+        for history in histories
+    ]
+
+    expected = embedder.create_batch_embeddings(histories)
+    actual = embedder.create_batch_embeddings(structured)
+
+    # "Days since last session" (second temporal feature) depends on the wall clock
+    mask = np.ones(expected.shape[1], dtype=bool)
+    mask[384 + 15 + 1] = False
+    np.testing.assert_allclose(actual[:, mask], expected[:, mask], rtol=1e-6)
+
 @patch("src.patterns.clustering.HDBSCAN")
 def test_clustering(mock_hdbscan):
     # Mock HDBSCAN
@@ -120,3 +144,71 @@ def test_analyzer(mock_llm_provider):
     
     assert len(personas) == 2  # Clusters 0 and 1
     assert personas[0]["persona"]["persona_name"] == "Test Persona"
+
+def test_cluster_statistics_counts_stages_and_ratios():
+    analyzer = PatternAnalyzer(llm_provider=MagicMock())
+    histories = [
+        [
+            {"intent": "category_research", "has_budget_constraint": True, "urgency_level": "high"},
+            {"intent": "compare_options", "confidence": 0.9},
+        ],
+        [{"intent": "ready_to_purchase", "confidence": 0.7}, {"intent": "other"}],
+    ]
+
+    stats = analyzer._extract_cluster_statistics(histories)
+
+    assert stats["total_sessions"] == 4
+    assert stats["stage_distribution"] == pytest.approx({"awareness": 100 / 3, "consideration": 100 / 3, "decision": 100 / 3})
+    assert stats["budget_conscious_ratio"] == 0.25
+    assert stats["avg_confidence"] == pytest.approx((0.5 + 0.9 + 0.7 + 0.5) / 4)
+    assert stats["urgency_distribution"] == {"high": 1, "medium": 3}
+    assert (stats["min_journey_length"], stats["max_journey_length"]) == (2, 2)
+
+def test_analyzer_async_runs_persona_calls_concurrently():
+    import asyncio
+
+    class SlowLLM:
+        in_flight = peak = 0
+
+        async def generate(self, prompt, system_prompt=""):
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+            await asyncio.sleep(0.01)
+            self.in_flight -= 1
+            return '{"persona_name": "Async Persona"}'
+
+    llm = SlowLLM()
+    analyzer = PatternAnalyzer(llm_provider=llm)
+    labels = np.array([2, 0, 1, -1, 0])
+    histories = [[{"intent": "buy"}], [{"intent": "browse"}], [{"intent": "compare"}], [], [{"intent": "browse"}]]
+
+    personas = asyncio.run(analyzer.analyze_all_clusters_async(labels, histories, max_concurrent=2))
+
+    assert [p["cluster_id"] for p in personas] == [0, 1, 2]
+    assert [p["size"] for p in personas] == [2, 1, 1]
+    assert all(p["persona"]["persona_name"] == "Async Persona" for p in personas)
+    assert llm.peak == 2
+
+def test_analyzer_reuses_persona_for_identical_statistics():
+    mock_llm = MagicMock()
+    mock_llm.generate_sync.return_value = '{"persona_name": "Cached Persona"}'
+    analyzer = PatternAnalyzer(llm_provider=mock_llm)
+    histories = [[{"intent": "buy", "confidence": 0.9}], [{"intent": "browse"}]]
+
+    first = analyzer.analyze_all_clusters(np.array([0, 1]), histories)
+    first[0]["persona"]["persona_name"] = "Edited"
+    second = analyzer.analyze_all_clusters(np.array([1, 0]), histories)
+
+    assert mock_llm.generate_sync.call_count == 2
+    assert second[0]["persona"]["persona_name"] == "Cached Persona"
+
+def test_parse_persona_response_strips_fences_and_trailing_commas():
+    analyzer = PatternAnalyzer(llm_provider=MagicMock())
+
+    fenced = analyzer._parse_persona_response('```json\n{"persona_name": "Fenced", "motivations": ["a",],}\n```')
+    inline = analyzer._parse_persona_response('Here you go: {"persona_name": "Inline"} Hope it helps.')
+
+    assert fenced["persona_name"] == "Fenced"
+    assert fenced["motivations"] == ["a"]
+    assert inline["persona_name"] == "Inline"
+    assert analyzer._parse_persona_response("no json here") is None
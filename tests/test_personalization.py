@@ -50,6 +50,18 @@ def test_content_personalization_respects_available_slots():
     assert all(action.get("slot") == "proof_bar" for action in slot_actions)
 
 
+def test_content_personalization_returns_independent_copies():
+    engine = ContentPersonalizationEngine()
+    first = engine.run(_mock_context())
+    for action in first.actions:
+        action.setdefault("content", {})["headline"] = "mutated"
+    first.metadata["selected_offer"]["name"] = "mutated"
+
+    second = engine.run(_mock_context())
+    assert all(action.get("content", {}).get("headline") != "mutated" for action in second.actions)
+    assert second.metadata["selected_offer"]["name"] != "mutated"
+
+
 def test_recommendation_selector_uses_intent_rules():
     selector = RecommendationSelector()
     result = selector.run(_mock_context("compare_options"))
@@ -66,3 +78,66 @@ def test_triggered_email_planner_uses_playbook_defaults():
     payload = result.actions[0]
     assert payload["type"] == "email_playbook"
     assert payload["steps"], "Playbook must include steps."
+
+
+def test_parallel_playbook_matches_sequential_order():
+    from src.activation.playbooks import Layer4ActivationPlaybook
+
+    context = _mock_context()
+    sequential = Layer4ActivationPlaybook(include_bidding=False, use_llm_brief=False).run(context)
+    parallel = Layer4ActivationPlaybook(include_bidding=False, use_llm_brief=False, parallel=True).run(context)
+
+    assert list(parallel.metadata) == list(sequential.metadata)
+    assert [action["type"] for action in parallel.actions] == [action["type"] for action in sequential.actions]
+
+
+def test_personalization_engines_share_one_config_parse():
+    content = ContentPersonalizationEngine()
+    email = TriggeredEmailPlanner()
+
+    assert content._config is email._config
+    try:
+        content._config["slots"] = {}
+    except TypeError:
+        pass
+    else:
+        raise AssertionError("Expected shared config to be read-only")
+
+
+def test_missing_personalization_config_falls_back_to_empty(tmp_path):
+    engine = ContentPersonalizationEngine(config_path=str(tmp_path / "missing.yaml"))
+
+    assert engine._config == {}
+    assert engine._slots == {}
+    result = engine.run(_mock_context())
+    assert result.actions == []
+    assert result.diagnostics == ["No personalization rules configured; skipping."]
+
+
+def test_nested_config_content_is_returned_as_plain_json(tmp_path):
+    import json
+
+    config_file = tmp_path / "personalization.yaml"
+    config_file.write_text(
+        "slots:\n"
+        "  hero_banner:\n"
+        "    default_content:\n"
+        "      headline: Hi\n"
+        "      media:\n"
+        "        image: {src: hero.png, sizes: [1x, 2x]}\n"
+        "    constraint_overrides:\n"
+        "      budget:\n"
+        "        badge: {style: {color: green}}\n",
+        encoding="utf-8",
+    )
+    engine = ContentPersonalizationEngine(config_path=str(config_file))
+
+    result = engine.run(_mock_context())
+    content = result.actions[0]["content"]
+
+    assert content["media"] == {"image": {"src": "hero.png", "sizes": ["1x", "2x"]}}
+    assert type(content["media"]["image"]) is dict
+    assert content["badge"] == {"style": {"color": "green"}}
+    json.dumps(result.actions)
+    content["media"]["image"]["src"] = "mutated.png"
+    assert engine.run(_mock_context()).actions[0]["content"]["media"]["image"]["src"] == "hero.png"